@@ -0,0 +1,131 @@
+"""
+Script used to generate panel b of Figure 3 and Figure 8, illustrating the regions in
+parameter space (in terms of $c$ and $\alpha$) in which the evolutionarily-stable and
+socially-optimal sociality strategies take on various qualitative behaviors for the
+case of Cobb-Douglas and linear utility.
+
+The regions are computed by sociality.regimes, which classifies $R_{ESS}$ and $R_{opt}$
+at every point of a dense $(\alpha, c)$ grid. A figure for another utility only needs
+an entry in FIGURES giving the colors and labels of its regions.
+"""
+
+import itertools
+import numpy as np
+import scipy.ndimage as ndi
+import matplotlib.pyplot as plt
+import matplotlib as mpl
+
+from sociality.regimes import (regime_map, regime_code, CORNER, INTERIOR, INFINITE,
+							   BELOW, ABOVE, EQUAL)
+from sociality.output import render_rc, save_figure
+
+"""
+Text is typeset with LaTeX in Helvetica for the 'publication' render profile, and with
+mathtext for the 'preview' profile (see sociality.output).
+"""
+plt.rcParams.update(render_rc({'font.family': 'sans-serif',
+							   'font.sans-serif': ['Helvetica'],
+							   'text.usetex': True}))
+
+alpha_max = 1.
+alpha_step = 0.001
+c_step = 0.002
+
+
+"""
+For each utility: the range of $c$ shown, the regions drawn (as regime codes with the
+color of their region), the labels placed in them, the font sizes of the axis labels
+and ticks and the output file.
+"""
+
+FIGURES = {
+	'cd': {
+		'c_max': 4.5,
+		'regions': [
+			(regime_code(INTERIOR, CORNER, ABOVE), 0.1),
+			(regime_code(INTERIOR, INTERIOR, ABOVE), 0.35),
+			(regime_code(INTERIOR, INTERIOR, BELOW), 0.6),
+			(regime_code(CORNER, INTERIOR, BELOW), 0.85)],
+		'annotations': [
+			(r"$\mathcal{R}_{\mathrm{ESS}} > \mathcal{R}_{\mathrm{opt}} = \frac{1}{c}$", (0.01,0.2)),
+			(r"$\mathcal{R}_{\mathrm{ESS}} > \mathcal{R}_{\mathrm{opt}} > \frac{1}{c}$", (0.6,0.5)),
+			(r"$ \mathcal{R}_{\mathrm{opt}} > \mathcal{R}_{\mathrm{ESS}}  > 1$", (0.6,2.5)),
+			(r"$ \mathcal{R}_{\mathrm{opt}} > \mathcal{R}_{\mathrm{ESS}}  = 1$", (0.01,2.5))],
+		'label_size': 28.,
+		'tick_size': 14.,
+		'filename': 'ESSvsSOregimes.png'},
+	'linear': {
+		'c_max': 2.,
+		'regions': [
+			(regime_code(INTERIOR, CORNER, ABOVE), 0.1),
+			(regime_code(INFINITE, INFINITE, EQUAL), 0.35),
+			(regime_code(CORNER, CORNER, EQUAL), 0.6),
+			(regime_code(CORNER, INFINITE, BELOW), 0.85)],
+		'annotations': [
+			(r"$\mathcal{R}_{\mathrm{ESS}} > 1$", (0.13,0.7)),
+			(r"$\mathcal{R}_{\mathrm{opt}} = 1$", (0.14,0.5)),
+			(r"$\mathcal{R}_{\mathrm{ESS}} = 1$", (0.13,1.5)),
+			(r"$\mathcal{R}_{\mathrm{opt}} = 1$", (0.14,1.3)),
+			(r"$\mathcal{R}_{\mathrm{ESS}} \in \{1,\infty\}$", (0.55,1.5)),
+			(r"$\mathcal{R}_{\mathrm{opt}} = \infty$", (0.56,1.3)),
+			(r"$\mathcal{R}_{\mathrm{ESS}} = \infty$", (0.75,0.7)),
+			(r"$\mathcal{R}_{\mathrm{opt}} = \infty$", (0.76,0.5))],
+		'label_size': 24.,
+		'tick_size': None,
+		'filename': 'ESSvsSOregimes_linear.png'},
+}
+
+
+"""
+Plotting the regions for different cases of $R_{ESS}$ and $R_{opt}$, with dashed lines
+along the boundaries between them. The grid points are the centres of the pixels, and
+points in none of the regions are drawn as part of the nearest region.
+"""
+
+def regimes_figure(utility, c_max, regions, annotations, label_size, tick_size, filename,
+				   **kwargs):
+
+	alpha_range = np.arange(0.5 * alpha_step,alpha_max,alpha_step)
+	c_range = np.arange(0.5 * c_step,c_max,c_step)
+	regime = regime_map(alpha_range[None,:],c_range[:,None],utility,**kwargs).regime
+
+	region_index = np.full(regime.shape,-1)
+	for index, (code, color) in enumerate(regions):
+		region_index[regime == code] = index
+	nearest = ndi.distance_transform_edt(region_index < 0, return_distances = False,
+										 return_indices = True)
+	region_index = region_index[tuple(nearest)]
+	region_cmap = mpl.colors.ListedColormap([plt.cm.YlOrRd(color) for code, color in regions])
+
+	plt.figure()
+	plt.imshow(region_index, origin = 'lower', aspect = 'auto', cmap = region_cmap,
+			   vmin = -0.5, vmax = len(regions) - 0.5, alpha = 0.6, interpolation = 'nearest',
+			   extent = [0.,alpha_max,0.,c_max])
+
+	for first, second in itertools.combinations(range(len(regions)), 2):
+		pair = np.ma.masked_array(region_index == first,
+								  mask = (region_index != first) & (region_index != second))
+		plt.contour(alpha_range,c_range,pair.astype(float),[0.5],
+					colors = 'k', linewidths = 5., linestyles = 'dashed')
+
+	for text, xy in annotations:
+		plt.annotate(text, xy = xy, fontsize = 24.)
+
+	plt.axis([0.,alpha_max,0.,c_max])
+
+	plt.xlabel(r"Relative Weight ($\alpha$)", fontsize = label_size, labelpad = 10.)
+	plt.ylabel(r"Relative Infectiousness ($c$)", fontsize = label_size)
+
+	if tick_size is not None:
+		plt.xticks(fontsize = tick_size)
+		plt.yticks(fontsize = tick_size)
+
+	plt.tight_layout()
+
+	save_figure(plt.gcf(), filename)
+
+
+for utility in ['cd', 'linear']:
+	regimes_figure(utility, **FIGURES[utility])
+
+plt.show()
@@ -1,11 +1,17 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-from matplotlib import rc
-rc('font',**{'family':'sans-serif','sans-serif':['Helvetica']})
-## for Palatino and other serif fonts use:
-#rc('font',**{'family':'serif','serif':['Palatino']})
-rc('text', usetex=True)
+from sociality.assortment import ess_assortment, ess_interpolation
+from sociality.config import script_parameters
+from sociality.output import render_rc, save_figure
+
+"""
+Text is typeset with LaTeX in Helvetica for the 'publication' render profile, and with
+mathtext for the 'preview' profile (see sociality.output).
+"""
+plt.rcParams.update(render_rc({'font.family': 'sans-serif',
+							   'font.sans-serif': ['Helvetica'],
+							   'text.usetex': True}))
 
 r_step = 0.01
 r_range = np.arange(0.0,1.0 + r_step,r_step)
@@ -14,73 +20,72 @@ m_step = 0.05
 m_max = 3.0
 m_range = np.arange(1.0,m_max + m_step,m_step)
 
-def boundaryM(alpha,c,r):
-	b = alpha * c * r - alpha * c + alpha - c * r - 1.0
-	denom = 2.0 * c * (1.0 - alpha)
-	num = -b + np.sqrt(b ** 2 - 4.0 * r * c * (1.0 - alpha))
-	return num / denom
-
-def boundaryr(alpha,c,M):
-	num = M * (1.0 - alpha + alpha * c) + M * M * (alpha * c - c)
-	denom = 1.0 - c * M + alpha * c * M
-	return num/denom + (1.0 - alpha + alpha * c) / (c * (1.0 - alpha))
-	
-def RESS(alpha,c):
-	return 1. / c + alpha / (1.0 - alpha)
-	
-def Ropt(alpha,c):
-	return 1. / (1.0 - alpha)
-	
-def interp(alpha,c,r):
-	return (1.0 - r) * RESS(alpha,c) + r * Ropt(alpha,c)
-	
-boundary_curve = boundaryM(0.75,0.5,r_range)
-interp_curve = interp(0.75,0.5,r_range)
-
-
-plt.figure(1)
-plt.plot(boundary_curve,r_range, lw = 3., color = "k", label = r"$\mathcal{R}_{\mathrm{ESS}}(\rho)$")
-plt.plot(interp_curve,r_range,lw = 3., color = 'k', ls  = '--', label = r"$(1-\rho)\mathcal{R}_{\mathrm{ESS}}(0) + \rho \mathcal{R}_{\mathrm{opt}}$")
-plt.axis([3.0,6.5,0.,1.])
-
-plt.fill_betweenx(r_range,0,boundary_curve, alpha = 0.7, color = 'r')
-plt.fill_betweenx(r_range,boundary_curve,100, alpha = 0.7, color = 'b')
-
-plt.xlabel(r"Sociality Level ($\mathcal{R}_{r}$)", fontsize = 25., labelpad = 10.)
-plt.ylabel(r"Assortment Probability ($\rho$)", fontsize = 25.)
-
-plt.legend(loc = "upper right", prop = {"size" : 20.})
-
-plt.annotate(r"$\mathcal{R}_r$ Increasing",xy = (3.35,0.2), fontsize = 25.)
-plt.annotate(r"$\mathcal{R}_r$ Decreasing",xy = (5.15,0.2), fontsize = 25.)
-
-plt.tight_layout()
-
-paper_path = "/Users/danielcooney/Desktop/Moran Process/Multilevel/CoCCoN"
-plt.savefig(paper_path + '/assortmentESScless1.png')
-
-plt.figure(2)
-
-boundary_curve2 = boundaryM(0.5,2.,r_range)
-interp_curve2 = interp(0.5,2.,r_range)
-plt.plot(boundary_curve2,r_range, lw = 3., color = "k", label = r"$\mathcal{R}_{\mathrm{ESS}}(\rho)$")
-plt.plot(interp_curve2,r_range,lw = 3., color = 'k', ls  = '--', label = r"$(1-\rho)\mathcal{R}_{\mathrm{ESS}}(0) + \rho \mathcal{R}_{\mathrm{opt}}$")
-plt.axis([1.2,2.4,0.,1.])
-
-plt.fill_betweenx(r_range,0,boundary_curve2, alpha = 0.7, color = 'r')
-plt.fill_betweenx(r_range,boundary_curve2,100, alpha = 0.7, color = 'b')
-
-plt.xlabel(r"Sociality Level ($\mathcal{R}_{r}$)", fontsize = 25., labelpad = 10.)
-plt.ylabel(r"Assortment Probability ($\rho$)", fontsize = 25.)
-
-plt.annotate(r"$\mathcal{R}_r$ Increasing",xy = (1.35,0.6), fontsize = 25.)
-plt.annotate(r"$\mathcal{R}_r$ Decreasing",xy = (1.95,0.6), fontsize = 25.)
-
-plt.legend(loc = "lower right", prop = {"size" :20.})
-
-plt.tight_layout()
-plt.savefig(paper_path + '/assortmentESScgreater1.png')
+"""
+The (alpha, c) pairs of the panels, which can be set from outside the script (see
+sociality.config).
+"""
+parameters = script_parameters(panels = [[0.75, 0.5], [0.5, 2.]])
+
+"""
+Layout of the panels of Figure 9: the range of $\mathcal{R}_r$ shown, the positions of
+the labels of the two regions, the legend location and the output file. Other panels
+are laid out from their curves.
+"""
+LAYOUTS = {
+	(0.75, 0.5): {
+		'R_range': [3.0,6.5],
+		'label_x': [3.35,5.15],
+		'label_y': 0.2,
+		'legend': "upper right",
+		'filename': 'assortmentESScless1.png'},
+	(0.5, 2.): {
+		'R_range': [1.2,2.4],
+		'label_x': [1.35,1.95],
+		'label_y': 0.6,
+		'legend': "lower right",
+		'filename': 'assortmentESScgreater1.png'},
+}
+
+
+def panel_layout(alpha, c, boundary_curve):
+	if (alpha, c) in LAYOUTS:
+		return LAYOUTS[(alpha, c)]
+	low, high = boundary_curve.min(), boundary_curve.max()
+	span = max(high - low, 0.1)
+	return {
+		'R_range': [low - 2.5 * span, high + 2.5 * span],
+		'label_x': [low - 2.45 * span, high + 0.05 * span],
+		'label_y': 0.2 if c < 1. else 0.6,
+		'legend': "upper right" if c < 1. else "lower right",
+		'filename': 'assortmentESS_alpha{}_c{}.png'.format(alpha, c)}
+
+
+for alpha, c in parameters['panels']:
+	boundary_curve = ess_assortment(alpha,c,r_range)
+	interp_curve = ess_interpolation(alpha,c,r_range)
+	layout = panel_layout(alpha, c, boundary_curve)
+
+	plt.figure()
+	plt.plot(boundary_curve,r_range, lw = 3., color = "k", label = r"$\mathcal{R}_{\mathrm{ESS}}(\rho)$")
+	plt.plot(interp_curve,r_range,lw = 3., color = 'k', ls  = '--', label = r"$(1-\rho)\mathcal{R}_{\mathrm{ESS}}(0) + \rho \mathcal{R}_{\mathrm{opt}}$")
+	plt.axis(layout['R_range'] + [0.,1.])
+
+	plt.fill_betweenx(r_range,0,boundary_curve, alpha = 0.7, color = 'r')
+	plt.fill_betweenx(r_range,boundary_curve,100, alpha = 0.7, color = 'b')
+
+	plt.xlabel(r"Sociality Level ($\mathcal{R}_{r}$)", fontsize = 25., labelpad = 10.)
+	plt.ylabel(r"Assortment Probability ($\rho$)", fontsize = 25.)
+
+	plt.legend(loc = layout['legend'], prop = {"size" : 20.})
+
+	increasing_x, decreasing_x = layout['label_x']
+	plt.annotate(r"$\mathcal{R}_r$ Increasing",xy = (increasing_x,layout['label_y']), fontsize = 25.)
+	plt.annotate(r"$\mathcal{R}_r$ Decreasing",xy = (decreasing_x,layout['label_y']), fontsize = 25.)
+
+	plt.tight_layout()
+
+	save_figure(plt.gcf(), layout['filename'])
 
 
 plt.show()
-	
+
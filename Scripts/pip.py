@@ -1,150 +1,79 @@
 """
 Script used to generate panel a of Figure 3, illustrating pairwise invasiblity plots
 for the adaptive dynamics under the Cobb-Douglas utility function.
+
+The model and the invasion computations live in the sociality package. matplotlib is
+only imported once a PIP is drawn, so this module can be imported for its functions
+without loading it or producing any figures.
 """
 
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-mpl.rcParams['text.usetex']=True
+
 import numpy as np
-from matplotlib.widgets import Slider
-from scipy.optimize import fsolve
 
-from matplotlib import rc
-rc('font',**{'family':'sans-serif','sans-serif':['Helvetica']})
-## for Palatino and other serif fonts use:
-#rc('font',**{'family':'serif','serif':['Palatino']})
-rc('text', usetex=True)
+from sociality.dilemma import ess_interior_cd as ess
+from sociality.invasion import (Ig_r, Ig_m, Sb_r, Sb_m, fitness, can_invade,
+                                can_mutually_invade, tiled_invasion_map,
+                                cached_invasion_map,
+                                invasion_boundary, boundary_regions,
+                                InvasionMapper, ProgressiveInvasionMap)
+from sociality.optimum import (social_optimum_cd, social_optimum_linear,
+                               social_optimum_ces, social_optimum)
+from sociality.config import script_parameters
+from sociality.output import render_rc, save_figure
+from sociality.workers import shared_executor, worker_budget
 
 slider_color = '#44782e'
 slider_transparency = 0.6
 
-"""
-Defining the endemic equilbria achieved for the resident and mutant populations in the
-presence of a rare mutant (as a function of the reproduction numbers for the two
-types).
-"""
-
-def Ig_r(R_res):
-    return np.maximum(0, 1 - 1 / R_res)
-
-def Ig_m(R_res, R_mut):
-    return np.maximum(
-        0, (R_mut * (R_res - 1)) / (R_res + R_mut * (R_res - 1)))
-
-def Sb_r(R_res, c):
-    return np.minimum(1, 1 / (c * R_res))
-
-def Sb_m(R_res, R_mut, c):
-    return R_res / (R_res + R_mut * (np.maximum(1, c * R_res) - 1))
-    
-    
-"""
-Defining the Cobb-Douglas, linear, and Constant Elasticity of Substitution (CES) utility 
-functions in terms of the endemic equilibria for the two contagions.
-"""
-
-def log_cd_fitness(Ig, Sb, alpha):
-    return (alpha * np.log(Ig) +
-            (1 - alpha) * np.log(Sb))
-
-def linear_fitness(Ig, Sb, alpha):
-    return np.array((alpha * Ig +
-                     (1 - alpha) * Sb))
-
-
-def log_ces_fitness(Ig, Sb, alpha, rho=1):
-    return np.array((1 / rho) * np.log(
-        alpha * np.power(Ig, rho)
-        + (1 - alpha) * np.power(Sb, rho)))
-
-def fitness(Ig, Sb, alpha, fitness_func='cd', **kwargs):
-    funcs = {'linear': linear_fitness,
-             'cd': log_cd_fitness,
-             'ces': log_ces_fitness}
-
-    return funcs[fitness_func](Ig, Sb, alpha, **kwargs)
-    
-    
-"""
-Charaterizing the criterion for when a rare mutant can invade a common resident.
-"""    
-
-def can_invade(R_res, R_mut, alpha, c,
-               fitness_func='cd',
-               **kwargs):
-    mut_fitness = fitness(
-        Ig_m(R_res, R_mut),
-        Sb_m(R_res, R_mut, c),
-        alpha,
-        fitness_func=fitness_func,
-        **kwargs)
-    
-    res_fitness = fitness(
-        Ig_r(R_res),
-        Sb_r(R_res, c),
-        alpha,
-        fitness_func=fitness_func,
-        **kwargs)
-
-    return mut_fitness > res_fitness
-
-
-def can_mutually_invade(R_res, R_mut, alpha, c,
-                        fitness_func='cd',
-                        **kwargs):
-    mut_inv_res = can_invade(R_res, R_mut, alpha, c,
-                             fitness_func,
-                             **kwargs)
-    res_inv_mut = can_invade(R_mut, R_res, alpha, c,
-                             fitness_func,
-                             **kwargs)
-
-    return 1.0 * mut_inv_res + (mut_inv_res * res_inv_mut)
-
-
-def social_optimum_cd(alpha, c):
+def invasion_map(alpha,
+                 c,
+                 R_max,
+                 R_min=1 + 1e-6,
+                 n_points=2000,
+                 fitness_func='cd',
+                 mutual=True,
+                 **kwargs):
     """
-    Cobb-Douglas utility social optimum
+    Invasion classification on the n_points x n_points grid of resident (columns) and
+    mutant (rows) reproduction numbers between R_min and R_max, as a uint8 array
+    computed tile by tile. Cached across runs by parameters and grid specification.
     """
-    if alpha > 1 - c:
-        return 1 / (1 - alpha)
-    else:
-        return 1 / c
+    edge_points = np.linspace(R_min, R_max, n_points)
 
-def social_optimum_linear(alpha, c):
+    return cached_invasion_map(edge_points, edge_points, alpha, c,
+                               fitness_func=fitness_func,
+                               mutual=mutual,
+                               **kwargs)
+
+def prefetch_invasion_maps(panels,
+                           R_max,
+                           R_min=1 + 1e-6,
+                           n_points=2000,
+                           fitness_func='cd',
+                           mutual=True,
+                           n_workers=None,
+                           **kwargs):
     """
-    Linear utility social optimum
+    Compute the invasion maps of several PIPs, given as (alpha, c) pairs, in the
+    shared pool of n_workers processes (by default the worker budget of
+    sociality.workers). The maps land in the cache, from which invasion_map then
+    returns them.
     """
-    if alpha > 1 / (1 + c):
-        return np.Inf
-    else:
-        return max(1, 1/c)
-
-
-def social_optimum_ces(alpha, c, rho=1):
-    if np.abs(rho - 1) < 1e-7:
-        return social_optimum_linear(alpha, c)
-    elif np.abs(rho) < 1e-7:
-        return social_optimum_cd(alpha, c)
-    else:
-        def func(x):
-            return (
-                (1 - alpha) + (alpha - 1) * x +
-                alpha * (c ** rho) * ((x - 1) ** rho))
-        return fsolve(func, 2)[0]
-
-def social_optimum(alpha, c, fitness_func='cd', **kwargs):
+    if n_workers is None:
+        n_workers = worker_budget()
+    if n_workers <= 1 or len(panels) <= 1:
+        return
 
-    funcs = {'linear': social_optimum_linear,
-             'cd': social_optimum_cd,
-             'ces': social_optimum_ces}
-
-    return funcs[fitness_func](alpha, c, **kwargs)
-        
-def ess(alpha, c):
-    return (((alpha - 1) - c * alpha) /
-            (c * (alpha - 1)))
+    edge_points = np.linspace(R_min, R_max, n_points)
+    executor = shared_executor(n_workers)
+    futures = [executor.submit(cached_invasion_map, edge_points, edge_points,
+                               alpha, c,
+                               fitness_func=fitness_func,
+                               mutual=mutual,
+                               **kwargs)
+               for alpha, c in panels]
+    for future in futures:
+        future.result()
 
 def pip(alpha,
         c,
@@ -158,34 +87,51 @@ def pip(alpha,
         plot_social_opt=True,
         fitness_func='cd',
         mutual=True,
+        mode='grid',
         **kwargs):
+    """
+    Draw the PIP on axis. With mode='grid' every point of the n_points x n_points grid
+    is classified and shown as an image, which is returned. With mode='boundary' only
+    the boundaries between the invasion regions are located, for n_points resident
+    values, and the regions between them are filled; the fills are returned.
+    """
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
 
     if axis is None:
         fig, axis = plt.subplots()
 
     if mutual:
-        inv_func = can_mutually_invade
-        inv_cmap = mpl.colors.ListedColormap([no_invade_color,
-                                              invade_color,
-                                              mutual_invade_color])
+        colors = [no_invade_color, invade_color, mutual_invade_color]
     else:
-        inv_func = can_invade
-        inv_cmap = mpl.colors.ListedColormap([no_invade_color,
-                                              invade_color])
-    
-    
-    edge_points = np.linspace(R_min, R_max, n_points)
-    pip_extent = [R_min, R_max, R_min, R_max]
-    
-    res, mut = np.meshgrid(edge_points,
-                           edge_points)
-    
-    imshow_img = axis.imshow(
-        inv_func(res, mut, alpha, c, fitness_func,
-                 **kwargs),
-        origin='lower',
-        cmap=inv_cmap,
-        extent=pip_extent)
+        colors = [no_invade_color, invade_color]
+
+    if mode == 'boundary':
+        boundary = invasion_boundary(np.linspace(R_min, R_max, n_points),
+                                     alpha, c, R_min, R_max,
+                                     fitness_func=fitness_func,
+                                     mutual=mutual,
+                                     **kwargs)
+        imshow_img = [axis.fill_between(res, lower, upper,
+                                        color=colors[region_class],
+                                        linewidth=0.5)
+                      for res, lower, upper, region_class
+                      in boundary_regions(boundary)]
+        axis.set_xlim(R_min, R_max)
+        axis.set_ylim(R_min, R_max)
+        axis.set_aspect('equal')
+    else:
+        inv_cmap = mpl.colors.ListedColormap(colors)
+
+        pip_extent = [R_min, R_max, R_min, R_max]
+
+        imshow_img = axis.imshow(
+            invasion_map(alpha, c, R_max, R_min=R_min, n_points=n_points,
+                         fitness_func=fitness_func, mutual=mutual,
+                         **kwargs),
+            origin='lower',
+            cmap=inv_cmap,
+            extent=pip_extent)
 
     if plot_social_opt:
         axis.axvline(
@@ -201,16 +147,27 @@ def pip(alpha,
 Plotting the pairwise insvasibility plots (PIPs).
 """
 
-def make_some_pips(fitness_func='cd'):
+def make_some_pips(fitness_func='cd', n_workers=None, alphas=(0.25, 0.75),
+                   cs=(0.25, 1., 4.)):
+    """
+    Figure 3a: PIPs for every alpha in alphas (rows) and c in cs (columns), by default
+    two values of alpha and three of c. The invasion maps are computed in n_workers
+    processes (by default the worker budget) before the panels are drawn.
+    """
+    import matplotlib.pyplot as plt
+
+    prefetch_invasion_maps([(alpha, c) for alpha in alphas for c in cs],
+                           R_max=10,
+                           fitness_func=fitness_func,
+                           n_workers=n_workers)
 
     #fig, axes = plt.subplots(3, 3, sharex = True, sharey = True, figsize = (9,9))
-    fig, axes = plt.subplots(2, 3, sharex = True, sharey = True, figsize = (9,6))
+    fig, axes = plt.subplots(len(alphas), len(cs), sharex = True, sharey = True,
+                             figsize = (3 * len(cs), 3 * len(alphas)), squeeze = False)
 
     #for row, alpha in enumerate([0.25, 0.5, 0.75]):
-    for row, alpha in enumerate([0.25, 0.75]):
-        for col, c in enumerate([0.25, 1., 4.]):
-            print(row, col)
-
+    for row, alpha in enumerate(alphas):
+        for col, c in enumerate(cs):
             pip(alpha,
                 c,
                 R_max = 10,
@@ -246,11 +203,33 @@ def adjustable_pip(
         fitness_func='cd',
         mutual=False,
         plot_social_opt=True,
+        redraw_delay=50,
+        progressive=False,
+        coarse_points=200,
         **kwargs):
+    """
+    Interactive PIP with sliders for alpha and c. Slider events are coalesced: the
+    PIP is recomputed redraw_delay milliseconds after the last event of a burst, for
+    the latest slider values only.
+
+    With progressive=True a coarse_points x coarse_points PIP is shown straight away
+    and refined in the background, by factors of four up to n_points, with each finer
+    level swapped in once it is ready. Moving a slider cancels the refinement.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+
     edge_points = np.linspace(R_min, R_max, n_points)
-    
-    res, mut = np.meshgrid(edge_points,
-                           edge_points)
+
+    if progressive:
+        levels = [coarse_points]
+        while 4 * levels[-1] < n_points:
+            levels.append(4 * levels[-1])
+        levels.append(n_points)
+        progressive_map = ProgressiveInvasionMap(R_min, R_max, levels,
+                                                 fitness_func=fitness_func,
+                                                 mutual=mutual,
+                                                 **kwargs)
 
     fig = plt.figure()
     pip_ax = fig.add_subplot(111)
@@ -273,7 +252,7 @@ def adjustable_pip(
         c_init,
         R_max,
         R_min=R_min,
-        n_points=n_points,
+        n_points=coarse_points if progressive else n_points,
         axis=pip_ax,
         plot_social_opt=False,
         fitness_func=fitness_func,
@@ -308,18 +287,27 @@ def adjustable_pip(
     c_slider.vline.set_color('k')
     alpha_slider.vline.set_color('k')
 
-    if mutual:
-        inv_func = can_mutually_invade
+    if progressive:
+        mapper = progressive_map.request
+        drawn = {'params': None}
     else:
-        inv_func = can_invade
-        
-    def update(val):
+        mapper = InvasionMapper(edge_points, edge_points,
+                                fitness_func=fitness_func,
+                                mutual=mutual,
+                                **kwargs)
+        drawn = {'params': (alpha_init, c_init)}
+
+    redraw_timer = fig.canvas.new_timer(interval=redraw_delay)
+    redraw_timer.single_shot = True
+
+    def redraw():
         new_alpha = alpha_slider.val
         new_c = c_slider.val
+        if drawn['params'] == (new_alpha, new_c):
+            return
+        drawn['params'] = (new_alpha, new_c)
 
-        new_plot = inv_func(res, mut, new_alpha, new_c,
-                            fitness_func=fitness_func,
-                            **kwargs)
+        new_plot = mapper(new_alpha, new_c)
         imshow_img.set_data(new_plot)
 
         if plot_social_opt:
@@ -332,9 +320,28 @@ def adjustable_pip(
         
         fig.canvas.draw_idle()
 
+    redraw_timer.add_callback(redraw)
+
+    def update(val):
+        redraw_timer.stop()
+        redraw_timer.start()
+
     alpha_slider.on_changed(update)
     c_slider.on_changed(update)
 
+    if progressive:
+        def swap_in_refinement():
+            finished = progressive_map.poll()
+            if finished is not None:
+                imshow_img.set_data(finished[1])
+                fig.canvas.draw_idle()
+
+        refine_timer = fig.canvas.new_timer(interval=100)
+        refine_timer.add_callback(swap_in_refinement)
+        refine_timer.start()
+        fig.canvas.mpl_connect('close_event', lambda event: progressive_map.close())
+        redraw()
+
     plt.show()
 
 	#for alpha, color in zip([0.1, 0.2, 0.9, 0.95],['red', 'green', 'blue', 'black']):
@@ -343,8 +350,24 @@ def adjustable_pip(
 	#	plt.plot(xs, log_res_fitness(xs, alpha, c), color=color)
 	#	plt.plot(social_optimum(alpha, c),log_res_fitness(social_optimum(alpha, c),alpha,c),'o',color=color)
 	
-make_some_pips('cd')
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    plt.rcParams.update(render_rc({'font.family': 'sans-serif',
+                                   'font.sans-serif': ['Helvetica'],
+                                   'text.usetex': True}))
 
-plt.savefig("sample_PIPs_2alpha.png")
+    """
+    The utility and the values of alpha and c of the panels, which can be set from
+    outside the script (see sociality.config).
+    """
+    parameters = script_parameters(fitness_func = 'cd',
+                                   alphas = [0.25, 0.75],
+                                   cs = [0.25, 1., 4.])
+
+    make_some_pips(parameters['fitness_func'],
+                   alphas = parameters['alphas'],
+                   cs = parameters['cs'])
 
-plt.show()
+    save_figure(plt.gcf(), "sample_PIPs_2alpha.png")
+
+    plt.show()
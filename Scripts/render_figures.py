@@ -0,0 +1,307 @@
+"""
+Headless rendering of the figures of the paper.
+
+Every figure script is run in a worker process with matplotlib's non-interactive Agg
+backend, so that independent figures are drawn concurrently and a full rebuild takes
+about as long as the slowest figure rather than the sum of all of them. Scripts with
+several expensive panels (the PIPs of pip.py) spread those over processes as well.
+All figures are written to one output directory, in one or more formats:
+
+    python render_figures.py --output figures --formats png,pdf
+    python render_figures.py pip stabilityregionfigure
+
+The scripts are the render stages of a sociality.pipeline graph, run once for each set
+of parameters in VARIANTS. The expensive inputs they share are compute stages that run
+first, concurrently, and leave their results in the array cache for the scripts. A
+stage whose code and parameters are unchanged since it last wrote to the output
+directory is skipped, so that a rerun rebuilds only the figures a change affects;
+--dry-run lists the stages that would run and --force reruns all of them.
+
+Parameters of the scripts (see sociality.config) can be overridden with --set, and
+--config runs the batch files given, each listing many runs, one after the other. All
+of it runs in this one process and its pool of workers, which import matplotlib and the
+package once and keep their caches warm from one figure and one batch to the next:
+
+    python render_figures.py replicator_equation --set Rr=7 --set Rm=3 --set c=2.
+    python render_figures.py --config sweeps.yaml --config appendix.json
+
+With --profile preview the text is set with matplotlib's mathtext instead of LaTeX and
+the figures are written at a lower resolution, which needs no TeX installation and is
+much faster for checking layout; the default 'publication' profile is the one used for
+the paper.
+"""
+
+import argparse
+import json
+import os
+import runpy
+import sys
+import warnings
+
+from sociality.dilemma import cached_alpha_curve
+from sociality.config import load_batch, parse_value
+from sociality.equilibrium import cached_equilibrium_sweep
+from sociality.inputs import ALPHA_AXIS, DILEMMA_CS, F_SWEEP, REPLICATOR_DEFAULTS
+from sociality.output import RENDER_PROFILES, render_profile, written_figures
+from sociality.pipeline import Pipeline
+
+
+SCRIPT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+"""
+File in the output directory keeping the state of the pipeline.
+"""
+STATE_FILE = '.render_state.json'
+
+"""
+The figure scripts and the figures of the paper they produce.
+"""
+FIGURES = {
+    'socialoptimumfigure': 'Figure 1',
+    'pip': 'Figure 3a',
+    'ESSandSO_regimes': 'Figures 3b and 8',
+    'replicator_equation': 'Figures 2 and 5',
+    'stabilityregionfigure': 'Figure 4',
+    'socialdilemma': 'Figures 3c, 6 and 7',
+    'assortmentselectiongradient': 'Figure 9',
+}
+
+
+"""
+Parameters of the runs of the figure scripts run more than once (see sociality.config):
+replicator_equation.py for each of the pairs (Rr, Rm) of Figures 2 and 5.
+"""
+VARIANTS = {
+    'replicator_equation': [{'Rr': 4, 'Rm': 3}, {'Rr': 7, 'Rm': 3}, {'Rr': 4, 'Rm': 5}],
+}
+
+def compute_stages(name, parameters):
+    """
+    The compute stages of the figure script name run with parameters, as
+    (stage name, function, parameters) triples. They call the cached functions with the
+    grids and defaults of sociality.inputs, which the scripts use as well.
+    """
+    if name == 'replicator_equation':
+        values = dict(REPLICATOR_DEFAULTS, **parameters)
+        Rm, Rr, c = values['Rm'], values['Rr'], values['c']
+        return [('equilibrium_sweep Rm={} Rr={} c={}'.format(Rm, Rr, c),
+                 cached_equilibrium_sweep, {'Rm': Rm, 'Rr': Rr, 'c': c, 'f_range': F_SWEEP})]
+    if name == 'socialdilemma':
+        return [('alpha_curve c={}'.format(c), cached_alpha_curve, {'alpha': ALPHA_AXIS, 'c': c})
+                for c in DILEMMA_CS]
+    return []
+
+
+"""
+Environment variables through which render_script passes its settings to a script.
+"""
+RENDER_VARIABLES = ('SOCIALITY_FIGURE_DIR', 'SOCIALITY_FIGURE_FORMATS',
+                    'SOCIALITY_RENDER_PROFILE', 'SOCIALITY_PARAMETERS')
+
+
+def render_script(name, output_dir, formats=None, profile=None, parameters=None):
+    """
+    Run the figure script name (without .py) headless with the given parameters,
+    writing its figures to output_dir in the given formats (by default those of the
+    script) with the given render profile (by default that of
+    SOCIALITY_RENDER_PROFILE). The variables of RENDER_VARIABLES are restored
+    afterwards, so that the settings of one run do not carry over to the next. Returns
+    the paths of the figures written.
+    """
+    import matplotlib
+    matplotlib.rcdefaults()
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    saved_environ = {key: os.environ.get(key) for key in RENDER_VARIABLES}
+    os.environ['SOCIALITY_FIGURE_DIR'] = os.path.abspath(output_dir)
+    if formats:
+        os.environ['SOCIALITY_FIGURE_FORMATS'] = ','.join(formats)
+    if profile:
+        os.environ['SOCIALITY_RENDER_PROFILE'] = profile
+    os.environ['SOCIALITY_PARAMETERS'] = json.dumps(parameters or {})
+    if SCRIPT_FOLDER not in sys.path:
+        sys.path.insert(0, SCRIPT_FOLDER)
+
+    del written_figures[:]
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='.*non-interactive.*')
+            runpy.run_path(os.path.join(SCRIPT_FOLDER, name + '.py'), run_name='__main__')
+    finally:
+        plt.close('all')
+        for key, value in saved_environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return list(written_figures)
+
+
+def script_runs(names=None):
+    """
+    The runs of the named figure scripts (all of FIGURES by default): one for each set
+    of parameters in VARIANTS, as dicts with the keys script and parameters.
+    """
+    if names is None:
+        names = list(FIGURES)
+    return [{'script': name, 'parameters': dict(parameters)}
+            for name in names for parameters in VARIANTS.get(name, [{}])]
+
+
+def apply_overrides(runs, overrides):
+    """
+    The runs with their parameters updated by overrides, a dict of values keyed by
+    parameter name, or by script and parameter name as in 'pip.alphas' for a parameter
+    of one script only.
+    """
+    updated = []
+    for run in runs:
+        parameters = dict(run.get('parameters') or {})
+        for key, value in overrides.items():
+            script, _, name = key.rpartition('.')
+            if script in ('', run['script']):
+                parameters[name] = value
+        updated.append(dict(run, parameters=parameters))
+    return updated
+
+
+def _stage_name(run):
+    name = ' '.join([run['script']] + ['{}={}'.format(key, json.dumps(value))
+                                       for key, value in sorted(run['parameters'].items())])
+    if run.get('output'):
+        name += ' in ' + run['output']
+    return name
+
+
+def figure_pipeline(runs=None, output_dir='figures', formats=None, profile=None):
+    """
+    The pipeline of the runs of the figure scripts (those of script_runs() by
+    default) into output_dir, or the subdirectory given as the output of a run, with
+    their compute stages. Its state is kept in output_dir.
+    """
+    if runs is None:
+        runs = script_runs()
+    runs = [dict(run, parameters=run.get('parameters') or {}) for run in runs]
+    unknown = sorted(set(run['script'] for run in runs) - set(FIGURES))
+    if unknown:
+        raise ValueError("Unknown figure scripts {}".format(unknown))
+    if profile is not None and profile not in RENDER_PROFILES:
+        raise ValueError("Unknown render profile '{}', expected one of {}".format(
+            profile, RENDER_PROFILES))
+    output_dir = os.path.abspath(output_dir)
+
+    pipeline = Pipeline(os.path.join(output_dir, STATE_FILE))
+    for run in runs:
+        name = _stage_name(run)
+        if name in pipeline.nodes:
+            continue
+        deps = []
+        for stage, func, params in compute_stages(run['script'], run['parameters']):
+            if stage not in pipeline.nodes:
+                pipeline.add(stage, func, params)
+            deps.append(stage)
+        pipeline.add(name, render_script,
+                     {'name': run['script'],
+                      'output_dir': os.path.join(output_dir, run.get('output') or ''),
+                      'formats': formats,
+                      'profile': profile,
+                      'parameters': run['parameters']},
+                     deps=deps,
+                     sources=[os.path.join(SCRIPT_FOLDER, run['script'] + '.py')],
+                     writes_files=True)
+    return pipeline
+
+
+def render(names=None, output_dir='figures', formats=None, n_workers=None, profile=None,
+           force=False, runs=None, overrides=None):
+    """
+    Render the named figure scripts (all of FIGURES by default), or the given runs of
+    them, with their parameters updated by overrides (see apply_overrides), into
+    output_dir with the given render profile, using n_workers processes (all cores by
+    default). Stages that are up to date are skipped unless force is True. Returns a
+    sociality.pipeline.NodeResult for every stage, in the order in which they finished.
+    """
+    if runs is None:
+        runs = script_runs(names)
+    runs = apply_overrides(runs, overrides or {})
+    os.makedirs(output_dir, exist_ok=True)
+    pipeline = figure_pipeline(runs, output_dir, formats, profile or render_profile())
+    return pipeline.run(n_workers=n_workers, force=force)
+
+
+def _parse_override(text):
+    key, equals, value = text.partition('=')
+    if not equals or not key:
+        raise argparse.ArgumentTypeError("expected key=value, not '{}'".format(text))
+    return key, parse_value(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('names', nargs='*', metavar='script',
+                        help="figure scripts to render (default: all of {})".format(
+                            ', '.join(sorted(FIGURES))))
+    parser.add_argument('--config', action='append', default=[], metavar='FILE',
+                        help="JSON or YAML batch file listing runs of the scripts; "
+                             "may be given several times")
+    parser.add_argument('--set', action='append', default=[], dest='overrides',
+                        type=_parse_override, metavar='[SCRIPT.]KEY=VALUE',
+                        help="override a parameter of the scripts, such as Rr=7, "
+                             "pip.alphas=[0.5] or assortmentselectiongradient.panels="
+                             "[[0.6,1.5]]")
+    parser.add_argument('--output', default=None,
+                        help="directory the figures are written to (default: figures)")
+    parser.add_argument('--formats', default=None,
+                        help="comma-separated file formats, such as png,pdf")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument('--profile', choices=RENDER_PROFILES, default=None,
+                        help="render profile (default: SOCIALITY_RENDER_PROFILE or "
+                             "publication)")
+    parser.add_argument('--force', action='store_true',
+                        help="rerun every stage, including those that are up to date")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="list the stages that would run, without running them")
+    args = parser.parse_args(argv)
+
+    names = [os.path.splitext(name)[0] for name in args.names] or None
+    if names and args.config:
+        parser.error("give either figure scripts or --config files")
+    overrides = dict(args.overrides)
+    batches = [(path, load_batch(path)) for path in args.config] or [(None, {})]
+
+    status = 0
+    for path, batch in batches:
+        output_dir = args.output or batch.get('output') or 'figures'
+        formats = args.formats or batch.get('formats')
+        if isinstance(formats, str):
+            formats = formats.split(',')
+        profile = args.profile or batch.get('profile') or render_profile()
+        n_workers = args.workers or batch.get('workers')
+        runs = apply_overrides(batch.get('runs') or script_runs(names), overrides)
+        if path is not None:
+            print("{}:".format(path))
+
+        if args.dry_run:
+            pipeline = figure_pipeline(runs, output_dir, formats, profile)
+            for name in pipeline.required() if args.force else pipeline.outdated():
+                print(name)
+            continue
+
+        results = render(output_dir=output_dir, formats=formats, n_workers=n_workers,
+                         profile=profile, force=args.force, runs=runs)
+        for result in results:
+            if result.status == 'built':
+                print("{}: built in {:.1f} s".format(result.name, result.seconds))
+            elif result.status == 'failed':
+                print("{}: failed: {!r}".format(result.name, result.error))
+            else:
+                print("{}: {}".format(result.name, result.status))
+        if any(result.status in ('failed', 'blocked') for result in results):
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,55 +6,69 @@ is used to generate Figure 2 and Figure 5.
 
 import matplotlib.pyplot as plt
 import numpy as np
-import os, os.path
 
-from matplotlib import rc
-rc('font',**{'family':'sans-serif','sans-serif':['Helvetica']})
-## for Palatino and other serif fonts use:
-#rc('font',**{'family':'serif','serif':['Palatino']})
-rc('text', usetex=True)
+from sociality.config import script_parameters
+from sociality.contagion import integrate_sweep
+from sociality.equilibrium import cached_equilibrium_sweep
+from sociality.inputs import F_STEP, F_SWEEP, REPLICATOR_DEFAULTS
+from sociality.recorder import TrajectoryRecorder
+from sociality.output import render_rc, save_figure
+from sociality.replicator import utility
+
+"""
+Text is typeset with LaTeX in Helvetica for the 'publication' render profile, and with
+mathtext for the 'preview' profile (see sociality.output).
+"""
+plt.rcParams.update(render_rc({'font.family': 'sans-serif',
+							   'font.sans-serif': ['Helvetica'],
+							   'text.usetex': True}))
 
 time_step = 0.1
 time_length = 8000
 
+"""
+Method used to integrate the contagion dynamics, both for the example trajectories and
+for the sweep over $f$: 'ros2' (error-controlled, stops once the state has converged)
+or 'euler' (fixed time_step). The sweep can instead solve for the long-time state
+directly with 'equilibrium'.
+"""
+integration_method = 'ros2'
+sweep_method = 'equilibrium'
 
 
 
-#Defines the grid for the fraction of mutant strategists $f$. 
-f_step = 0.01
-f_range = np.arange(f_step,1.0 + f_step,f_step)
-
-c = 4.
-alpha = 0.75
 
-Rr = 4
-Rm = 3
+#Defines the grid for the fraction of mutant strategists $f$ (see sociality.inputs). 
+f_step = F_STEP
+f_range = F_SWEEP[1:]
 
 """
-Initial conditions for the two-contagion dynamics with a resident strategy r and
-mutant strategy m. 
+Relative infectiousness, weight on the good contagion and sociality strategies of the
+resident and mutant type, and initial conditions for the two-contagion dynamics with a
+resident strategy r and mutant strategy m. These can be set from outside the script
+(see sociality.config); render_figures.py runs it for each (Rr, Rm) of Figures 2 and 5.
+The defaults are those of sociality.inputs.
 """
-Img0 = 0.2
-Irg0 = 0.8
+parameters = script_parameters(**REPLICATOR_DEFAULTS)
 
-Imb0 = 0.2
-Irb0 = 0.2
+c = parameters['c']
+alpha = parameters['alpha']
 
-Img = Img0
-Irg = Irg0
+Rr = parameters['Rr']
+Rm = parameters['Rm']
 
-Imb = Imb0
-Irb = Irb0
+Img0 = parameters['Img0']
+Irg0 = parameters['Irg0']
+
+Imb0 = parameters['Imb0']
+Irb0 = parameters['Irb0']
 
 """
-Lists of epidemiological quantities used to track time-dependent dynamics.
+Recorder for the example trajectories of the contagion dynamics, keeping at most
+trajectory_capacity states (every other state is dropped whenever it fills up).
 """
-
-Imglist = [Img]
-Irglist = [Irg]
-Imblist = [Imb]
-Irblist = [Irb]
-time_list = [0.]
+trajectory_capacity = 10000
+trajectory = TrajectoryRecorder(mode = 'decimate', capacity = trajectory_capacity)
 
 
 """
@@ -63,50 +77,18 @@ Start with f = 0, so whole population consists of resident strategy.
 f = 0.0
 
 """
-Defining right-hand sides for the contagion dynamics for various strategy fractions
-f, as well as the Cobb-Douglas utility function used for replicator equation.
+The right-hand sides for the contagion dynamics for various strategy fractions f are
+defined in sociality.contagion, and the Cobb-Douglas utility function used for the
+replicator equation in sociality.replicator.
 """
-
-def Im_righthand(Rm,Rr,f,Im,Ir):
-	weight = (Rr * (1-f) * Ir + Rm * f * Im) / (Rr * (1-f) + Rm * f)
-	return Rm * weight * (1.0 - Im) - Im
-	
-def Ir_righthand(Rm,Rr,f,Im,Ir):
-	weight = (Rr * (1-f) * Ir + Rm * f * Im) / (Rr * (1-f) + Rm * f)
-	return Rr * weight * (1.0 - Ir) - Ir
-	
-def utility(alpha,Ig,Ib):
-	return (Ig ** alpha) * ((1.0 - Ib)**(1.0 - alpha))
-	
-	
 	
 """
 Calculating example time-dependent trajectories for contagion dynamics. 
 """	
-	
-for time in range(20000):
-	Img = Img + time_step * Im_righthand(Rm,Rr,f,Img,Irg)
-	Irg = Irg + time_step * Ir_righthand(Rm,Rr,f,Img,Irg)
-	
-	Imb = Imb + time_step * Im_righthand(c*Rm,c*Rr,f,Imb,Irb)
-	Irb = Irb + time_step * Ir_righthand(c*Rm,c*Rr,f,Imb,Irb)
-	
-
-	
-	
-	Imglist.append(Img)
-	Irglist.append(Irg)
-	
-	Imblist.append(Imb)
-	Irblist.append(Irb)
-	
-	time_list.append(time_step*time)
-	
-Imgendlist = [Img]
-Irgendlist = [Irg]
-Imbendlist = [Imb]
-Irbendlist = [Irb]	
 
+good_trajectory, bad_trajectory = integrate_sweep(Rm,Rr,c,f,Img0,Irg0,Imb0,Irb0,
+	method = integration_method, time_step = time_step, t_max = time_step * 20000,
+	callback = trajectory)
 
 	
 plt.figure(1)
@@ -115,11 +97,11 @@ plt.figure(1)
 Plot of example trajectories for contagion dynamics. 
 """
 
-plt.plot(time_list,Imglist,'b', lw = 3.)	
-plt.plot(time_list,Irglist,'g', lw = 3.)	
+plt.plot(trajectory.t[:,0],trajectory.Im[:,0],'b', lw = 3.)	
+plt.plot(trajectory.t[:,0],trajectory.Ir[:,0],'g', lw = 3.)	
 
-plt.plot(time_list,Imblist,'b', lw = 3.,ls = '--')	
-plt.plot(time_list,Irblist,'g', lw = 3., ls = '--')	
+plt.plot(trajectory.t[:,1],trajectory.Im[:,1],'b', lw = 3.,ls = '--')	
+plt.plot(trajectory.t[:,1],trajectory.Ir[:,1],'g', lw = 3., ls = '--')	
 
 #print time_list
 #print Imlist
@@ -131,43 +113,31 @@ of possible fraction of mutant strategies $f$ contained in f_range.
 """
 
 """
-List of equilibrium fractions of infectious individuals for each contagion for both
-the resident and mutant strategy. List initialized with values corresponding 
-"""
-
-Imglist = [Img]
-Irglist = [Irg]
-Imblist = [Imb]
-Irblist = [Irb]
-time_list = [0.]
-
-
-"""
-Calculate contagion dynamics for 8000 time steps with step of 0.1, for each fraction of
-mutant strategies. Initial condition for given f chosen as long-time state achieved for
-previous mutant fraction $f$. This long-time state (either a disease-free or endemic 
+Calculate the long-time state of the contagion dynamics for all fractions of mutant
+strategies at once. This long-time state (either a disease-free or endemic 
 equilibrium depending on basic reproduction number calculated in Section A.2) is unique
-by the result of Hethcote and Yorke. 
+by the result of Hethcote and Yorke. With sweep_method = 'equilibrium' it is computed in
+sociality.equilibrium from the shared weight term, and cached across runs; otherwise
+each $f$ is integrated from the $f = 0$ long-time state for up to 8000 time steps of
+0.1, and the work needed for each $f$ is printed.
 """
-for f in f_range:
-	for time in range(time_length):
-		Img = Img + time_step * Im_righthand(Rm,Rr,f,Img,Irg)
-		Irg = Irg + time_step * Ir_righthand(Rm,Rr,f,Img,Irg)
-		
-		Imb = Imb + time_step * Im_righthand(c*Rm,c*Rr,f,Imb,Irb)
-		Irb = Irb + time_step * Ir_righthand(c*Rm,c*Rr,f,Imb,Irb)
+f_sweep = F_SWEEP
+
+if sweep_method == 'equilibrium':
+	Imgendlist, Irgendlist, Imbendlist, Irbendlist = cached_equilibrium_sweep(Rm,Rr,c,f_sweep)
+else:
+	good_sweep, bad_sweep = integrate_sweep(Rm,Rr,c,f_sweep,
+		good_trajectory.Im,good_trajectory.Ir,bad_trajectory.Im,bad_trajectory.Ir,
+		method = sweep_method, time_step = time_step, t_max = time_step * time_length)
 	
-		Imglist.append(Img)
-		Irglist.append(Irg)
-		Imblist.append(Imb)
-		Irblist.append(Irb)
-		
-	Imgendlist.append(Img)
-	Irgendlist.append(Irg)
-	Imbendlist.append(Imb)
-	Irbendlist.append(Irb)
+	Imgendlist, Irgendlist = good_sweep.Im, good_sweep.Ir
+	Imbendlist, Irbendlist = bad_sweep.Im, bad_sweep.Ir
+	
+	for k in range(len(f_sweep)):
+		print("f = {:.2f}: good {} steps, {} evaluations; bad {} steps, {} evaluations".format(
+			f_sweep[k], good_sweep.n_steps[k], good_sweep.n_evals[k],
+			bad_sweep.n_steps[k], bad_sweep.n_evals[k]))
 	
-
 """
 Figure illustrating long-time equilibrium level of infection for good and bad contagion
 in the resident and mutant populations, plotted as a function of the mutant fraction $f$.
@@ -188,13 +158,14 @@ plt.ylabel(r"Infected Fraction at Steady State", fontsize = 22.)
 
 plt.axis([0.0,1.0,0.0,1.0])
 
-paper_path = os.getcwd()
 if Rr == 7 and Rm == 3:
-	plt.savefig(paper_path + '/endemiccoexist.png')
+	save_figure(plt.gcf(), 'endemiccoexist.png')
 elif Rr == 4 and Rm == 5 and time_length == 8000:
-	plt.savefig(paper_path + '/endemiccless1.png')
+	save_figure(plt.gcf(), 'endemiccless1.png')
 elif Rr == 4 and Rm == 3 and time_length == 8000:
-	plt.savefig(paper_path + '/endemicgreater1.png')
+	save_figure(plt.gcf(), 'endemicgreater1.png')
+else:
+	save_figure(plt.gcf(), 'endemic_Rr{}_Rm{}.png'.format(Rr,Rm))
 
 Umlist = []
 Urlist = []
@@ -225,8 +196,8 @@ plt.plot(f_axis,Urlist,'b', lw = 5., label = r"$U_r(\hat{I}_r^g,\hat{S}_r^b)$")
 Calculate utility of resident type at all-resident equilibrium and utility of mutant type
 at all-mutant equilibrium, which allows us to confirm presence of social dilemma.
 """
-print Umlist[-1]
-print Urlist[0]
+print(Umlist[-1])
+print(Urlist[0])
 
 plt.xlabel(r"Mutant Fraction ($f$)", fontsize = 22.)
 plt.ylabel(r"Utility", fontsize = 22.)
@@ -237,13 +208,14 @@ plt.legend(loc = "lower left", fontsize = 24., frameon = False)
 #plt.axis([0.0,1.0,0.19,0.25])
 	
 
-paper_path = os.getcwd()
 if Rr == 7 and Rm == 3:
-	plt.savefig(paper_path + '/replicatorcoexist.png')
+	save_figure(plt.gcf(), 'replicatorcoexist.png')
 elif Rr == 4 and Rm == 5 and time_length == 8000:
-	plt.savefig(paper_path + '/replicatorcless1.png')
+	save_figure(plt.gcf(), 'replicatorcless1.png')
 elif Rr == 4 and Rm == 3 and time_length == 8000:
-	plt.savefig(paper_path + '/replicatorgreater1.png')
+	save_figure(plt.gcf(), 'replicatorgreater1.png')
+else:
+	save_figure(plt.gcf(), 'replicator_Rr{}_Rm{}.png'.format(Rr,Rm))
 	
 
 
@@ -255,7 +227,7 @@ plt.figure(4)
 
 group_utility_list = []
 for f in range(len(Imgendlist)):
-	f_frac = f / np.float(len(Imgendlist) + 1)
+	f_frac = f / float(len(Imgendlist) + 1)
 	util = f_frac * Umlist[f] + (1.0 - f_frac) * Urlist[f]
 	group_utility_list.append(util)
 	
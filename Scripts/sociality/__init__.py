@@ -0,0 +1,4 @@
+"""
+Numerical routines for the two-strategy contagion model, shared by the figure scripts in
+this folder. Nothing in this package imports matplotlib or produces plots.
+"""
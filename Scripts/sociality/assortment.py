@@ -0,0 +1,49 @@
+"""
+Evolutionarily-stable sociality under Cobb-Douglas utility when individuals interact
+assortatively, meeting their own strategy with probability r (the assortment
+probability $\rho$ of Figure 9).
+
+The ESS is the positive root of a quadratic in R derived in Appendix B.4 (see
+Notebook/AssortativeSocialityModel.nb). It runs from the ESS of the well-mixed
+population at r = 0 to the social optimum at r = 1; ess_interpolation is the straight
+line between these two for comparison.
+"""
+
+import numpy as np
+
+from sociality.dilemma import ess_interior_cd
+
+
+def ess_assortment(alpha, c, r):
+    """
+    Evolutionarily-stable sociality at assortment probability r.
+    """
+    b = alpha * c * r - alpha * c + alpha - c * r - 1.0
+    denom = 2.0 * c * (1.0 - alpha)
+    num = -b + np.sqrt(b ** 2 - 4.0 * r * c * (1.0 - alpha))
+    return num / denom
+
+
+def assortment_for_ess(alpha, c, M):
+    """
+    Assortment probability at which the evolutionarily-stable sociality is M; the
+    inverse of ess_assortment.
+    """
+    num = M * (1.0 - alpha + alpha * c) + M * M * (alpha * c - c)
+    denom = 1.0 - c * M + alpha * c * M
+    return num / denom + (1.0 - alpha + alpha * c) / (c * (1.0 - alpha))
+
+
+def social_optimum_interior_cd(alpha):
+    """
+    Interior branch 1 / (1 - alpha) of the Cobb-Douglas social optimum, which is the
+    optimum for alpha > 1 - c.
+    """
+    return 1. / (1.0 - alpha)
+
+
+def ess_interpolation(alpha, c, r):
+    """
+    (1 - r) R_ESS(0) + r R_opt, linear in the assortment probability r.
+    """
+    return (1.0 - r) * ess_interior_cd(alpha, c) + r * social_optimum_interior_cd(alpha)
@@ -0,0 +1,213 @@
+"""
+Out-of-core atlas of the social dilemma under CES utility over (alpha, c, rho).
+
+A PoAAtlas holds R_ESS, R_opt, their utilities and the Price of Anarchy on a rectilinear
+(alpha, c, rho) grid, computed with sociality.dilemma.ces_surfaces. The grid is split
+into chunks of fixed shape, and every chunk is stored in its own .npy file holding all
+fields, so that
+
+- chunks are computed in parallel and written independently,
+- an interrupted build resumes with the chunks that are still missing, and
+- reading a slice only touches the chunks it intersects, memory-mapped.
+
+An atlas is a directory with axes.npz (the grid and the chunk shape) and a chunks/
+subdirectory with one file per computed chunk. Points in chunks that have not been
+computed read as NaN.
+"""
+
+import itertools
+import os
+
+import numpy as np
+
+from sociality.dilemma import DilemmaSurfaces, ces_surfaces
+from sociality.workers import shared_executor, worker_budget
+
+
+FIELDS = DilemmaSurfaces._fields
+
+AXES = ('alpha', 'c', 'rho')
+
+
+def _chunk_values(alpha, c, rho):
+    """
+    All fields on the grid alpha x c x rho, as an array of shape
+    (len(FIELDS), n_alpha, n_c, n_rho).
+    """
+    surfaces = ces_surfaces(alpha[:, None, None], c[None, :, None], rho[None, None, :])
+    return np.stack(surfaces)
+
+
+def _write_chunk(filename, alpha, c, rho):
+    """
+    Compute one chunk and store it in filename. The chunk is written to a temporary
+    file first and moved into place, so a file that exists is always complete.
+    """
+    values = _chunk_values(alpha, c, rho)
+    temporary = filename + '.{}.tmp'.format(os.getpid())
+    with open(temporary, 'wb') as f:
+        np.save(f, values)
+    os.replace(temporary, filename)
+    return filename
+
+
+def _axis_index(key, n):
+    """
+    Grid indices selected by an integer, slice or integer array key along an axis of
+    length n, and whether the axis is kept in the result.
+    """
+    if isinstance(key, slice):
+        return np.arange(n)[key], True
+    key = np.asarray(key)
+    if key.ndim == 0:
+        index = int(key)
+        if not -n <= index < n:
+            raise IndexError("index {} is out of bounds for an axis of "
+                             "length {}".format(index, n))
+        return np.array([index % n]), False
+    return np.arange(n)[key], True
+
+
+class PoAAtlas(object):
+    """
+    The CES dilemma surfaces on the grid alpha x c x rho, stored in directory in
+    chunks of shape chunks. Use PoAAtlas.create for a new atlas and PoAAtlas(directory)
+    to open an existing one.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with np.load(os.path.join(directory, 'axes.npz')) as data:
+            self.axes = [data[name] for name in AXES]
+            self.chunks = tuple(int(n) for n in data['chunks'])
+
+    @classmethod
+    def create(cls, directory, alpha, c, rho, chunks=(32, 32, 8)):
+        """
+        Set up an empty atlas in directory. Nothing is computed until build is called.
+        """
+        axes = [np.asarray(x, dtype=float).ravel() for x in (alpha, c, rho)]
+        if len(chunks) != 3 or min(chunks) < 1:
+            raise ValueError("chunks must be three positive chunk lengths")
+        os.makedirs(os.path.join(directory, 'chunks'), exist_ok=True)
+        np.savez(os.path.join(directory, 'axes.npz'),
+                 alpha=axes[0], c=axes[1], rho=axes[2], chunks=np.array(chunks))
+        return cls(directory)
+
+    @property
+    def shape(self):
+        return tuple(len(axis) for axis in self.axes)
+
+    @property
+    def chunk_grid(self):
+        """
+        Number of chunks along each axis.
+        """
+        return tuple(-(-n // k) for n, k in zip(self.shape, self.chunks))
+
+    def _filename(self, index):
+        return os.path.join(self.directory, 'chunks', '{}_{}_{}.npy'.format(*index))
+
+    def _chunk_axes(self, index):
+        return [axis[i * k:(i + 1) * k]
+                for axis, i, k in zip(self.axes, index, self.chunks)]
+
+    def missing_chunks(self):
+        """
+        Indices of the chunks that have not been computed yet.
+        """
+        return [index for index in itertools.product(*map(range, self.chunk_grid))
+                if not os.path.exists(self._filename(index))]
+
+    def build(self, n_workers=None):
+        """
+        Compute every missing chunk, in the shared pool of n_workers processes (by
+        default the worker budget) of sociality.workers, or serially for one worker.
+        Returns the number of chunks computed.
+        """
+        missing = self.missing_chunks()
+        if n_workers is None:
+            n_workers = worker_budget()
+
+        jobs = [(self._filename(index),) + tuple(self._chunk_axes(index))
+                for index in missing]
+        if n_workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                _write_chunk(*job)
+        else:
+            list(shared_executor(n_workers).map(_write_chunk, *zip(*jobs)))
+        return len(missing)
+
+    def read(self, field, key=(slice(None),) * 3):
+        """
+        The values of field at the grid points selected by key, a tuple of an integer,
+        slice or integer array for each of alpha, c and rho, as for numpy indexing
+        (integer arrays select along their axis independently). Only the chunks that
+        intersect the selection are read.
+        """
+        which = FIELDS.index(field)
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = key + (slice(None),) * (3 - len(key))
+        selected, kept = zip(*[_axis_index(k, n) for k, n in zip(key, self.shape)])
+
+        result = np.full([len(index) for index in selected], np.nan)
+        owners = [index // k for index, k in zip(selected, self.chunks)]
+        for chunk in itertools.product(*[np.unique(owner) for owner in owners]):
+            filename = self._filename(chunk)
+            if not os.path.exists(filename):
+                continue
+            positions = [np.flatnonzero(owner == i) for owner, i in zip(owners, chunk)]
+            local = [index[position] - i * k for index, position, i, k
+                     in zip(selected, positions, chunk, self.chunks)]
+            values = np.load(filename, mmap_mode='r')[which]
+            result[np.ix_(*positions)] = values[np.ix_(*local)]
+
+        return result.reshape([len(index) for index, keep in zip(selected, kept)
+                               if keep])
+
+    def __getitem__(self, key):
+        """
+        atlas[field] reads the whole field; atlas[field, i, j, k] reads a selection as
+        for read.
+        """
+        if isinstance(key, tuple):
+            return self.read(key[0], key[1:])
+        return self.read(key)
+
+    def section(self, field, **values):
+        """
+        The values of field on the grid points nearest to the given values of any of
+        alpha, c and rho, for instance atlas.section('PoA', rho=0.5). Returns the grid
+        values used for the fixed axes and the section along the free ones.
+        """
+        unknown = set(values) - set(AXES)
+        if unknown:
+            raise ValueError("unknown axes {}".format(sorted(unknown)))
+        key, nearest = [], {}
+        for name, axis in zip(AXES, self.axes):
+            if name in values:
+                index = int(np.argmin(np.abs(axis - values[name])))
+                key.append(index)
+                nearest[name] = axis[index]
+            else:
+                key.append(slice(None))
+        return nearest, self.read(field, tuple(key))
+
+
+def build_atlas(directory, alpha, c, rho, chunks=(32, 32, 8), n_workers=None):
+    """
+    Open the atlas in directory, or create it on the given grid if there is none, and
+    compute any missing chunks. Raises ValueError if an existing atlas has a different
+    grid.
+    """
+    if os.path.exists(os.path.join(directory, 'axes.npz')):
+        atlas = PoAAtlas(directory)
+        axes = [np.asarray(x, dtype=float).ravel() for x in (alpha, c, rho)]
+        if (any(not np.array_equal(a, b) for a, b in zip(atlas.axes, axes)) or
+                atlas.chunks != tuple(chunks)):
+            raise ValueError("{} holds an atlas on a different grid".format(directory))
+    else:
+        atlas = PoAAtlas.create(directory, alpha, c, rho, chunks=chunks)
+    atlas.build(n_workers=n_workers)
+    return atlas
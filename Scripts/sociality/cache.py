@@ -0,0 +1,237 @@
+"""
+Persistent memoization of array-valued computations.
+
+Results are addressed by a hash of the function's name and source code, of its module
+and every module of the package that module imports, directly or not, and of its
+arguments (parameters, grid specifications and any array arguments). Repeated runs and
+figure tweaks reuse earlier results, while a change to any code the function may call
+leaves them behind. There are two tiers: an in-memory least-recently-used tier, and an
+on-disk tier of .npz files with a size cap, from which the least recently used files
+are evicted first.
+
+The on-disk tier lives in the directory named by the SOCIALITY_CACHE_DIR environment
+variable, or in ~/.cache/sociality by default.
+"""
+
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from sociality.sources import code_digest
+
+
+def _canonical(value):
+    """
+    JSON-serializable description of an argument that identifies its content.
+    """
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return ['ndarray', str(value.dtype), list(value.shape), digest]
+    if isinstance(value, (np.generic, float, int, bool)) or value is None:
+        return repr(value.item() if isinstance(value, np.generic) else value)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    raise TypeError("Cannot build a cache key from {!r}".format(value))
+
+
+def cache_key(name, *args, **kwargs):
+    """
+    Content hash identifying a computation by name and arguments.
+    """
+    description = json.dumps([name, _canonical(list(args)), _canonical(kwargs)],
+                             sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+def _nbytes(result):
+    if isinstance(result, tuple):
+        return sum(np.asarray(r).nbytes for r in result)
+    return np.asarray(result).nbytes
+
+
+def _read_only(result):
+    if isinstance(result, tuple):
+        return tuple(_read_only(r) for r in result)
+    result = np.array(result)
+    result.flags.writeable = False
+    return result
+
+
+class ArrayCache(object):
+    """
+    Two-tier cache of arrays and tuples of arrays. The in-memory tier holds at most
+    max_memory_bytes; the on-disk tier in directory holds at most max_disk_bytes (no
+    disk tier if directory is None).
+    """
+
+    def __init__(self, directory=None,
+                 max_memory_bytes=256 * 2 ** 20,
+                 max_disk_bytes=2 * 2 ** 30,
+                 compress=True):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.compress = compress
+
+        self.memory = collections.OrderedDict()
+        self.memory_bytes = 0
+
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _remember(self, key, result):
+        size = _nbytes(result)
+        if size > self.max_memory_bytes:
+            return
+        if key in self.memory:
+            self.memory_bytes -= _nbytes(self.memory.pop(key))
+        self.memory[key] = result
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_memory_bytes:
+            old_key, old_result = self.memory.popitem(last=False)
+            self.memory_bytes -= _nbytes(old_result)
+
+    def get(self, key):
+        """
+        The cached result for key, or None if there is none.
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as data:
+                arrays = [data['arr_{}'.format(i)] for i in range(len(data.files) - 1)]
+                is_tuple = bool(data['is_tuple'])
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(self._path(key), None)
+        except FileNotFoundError:
+            pass
+
+        result = _read_only(tuple(arrays) if is_tuple else arrays[0])
+        self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        """
+        Store an array or a tuple of arrays under key in both tiers, and return the
+        (read-only) stored result.
+        """
+        result = _read_only(result)
+        self._remember(key, result)
+
+        if self.directory is not None and _nbytes(result) <= self.max_disk_bytes:
+            arrays = result if isinstance(result, tuple) else (result,)
+            save = np.savez_compressed if self.compress else np.savez
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(handle, 'wb') as temp_file:
+                    save(temp_file, *arrays, is_tuple=isinstance(result, tuple))
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self._evict()
+
+        return result
+
+    def _evict(self):
+        """
+        Delete the least recently used files until the disk tier fits its size cap.
+        Other processes share the directory and may delete files in the meantime.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for mtime, size, name in entries)
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.memory.clear()
+        self.memory_bytes = 0
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.directory, name))
+
+
+_default_cache = None
+
+def default_cache():
+    """
+    The shared cache, created on first use.
+    """
+    global _default_cache
+    if _default_cache is None:
+        directory = os.environ.get(
+            'SOCIALITY_CACHE_DIR',
+            os.path.join(os.path.expanduser('~'), '.cache', 'sociality'))
+        _default_cache = ArrayCache(directory)
+    return _default_cache
+
+
+def _source_hash(func):
+    try:
+        source = inspect.getsource(func)
+        source += code_digest(inspect.getsourcefile(func))
+    except (IOError, OSError, TypeError, SyntaxError):
+        source = ''
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def memoize(func=None, cache=None):
+    """
+    Decorator caching an array-valued function on the content of its arguments, its
+    source code and the code of its module and the modules it imports. Use as @memoize,
+    or memoize(func, cache=...) with a specific ArrayCache. Results are returned
+    read-only.
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache)
+
+    name = '{}.{}:{}'.format(func.__module__, func.__name__, _source_hash(func))
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache if cache is not None else default_cache()
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = cache_key(name, **bound.arguments)
+
+        result = store.get(key)
+        if result is None:
+            result = store.put(key, func(*args, **kwargs))
+        return result
+
+    return wrapper
@@ -0,0 +1,90 @@
+"""
+Parameters of the figure scripts that can be set from outside the script.
+
+A script declares its parameters and their defaults with script_parameters. Values
+given as a JSON object in the SOCIALITY_PARAMETERS environment variable override the
+defaults, so that render_figures.py can run one script for several parameter sets, for
+instance replicator_equation.py for each pair (Rr, Rm) of Figures 2 and 5.
+
+Batch files list many such runs for render_figures.py, in JSON or (with PyYAML
+installed) YAML:
+
+    output: figures
+    profile: preview
+    runs:
+      - script: replicator_equation
+        parameters: {Rr: 7, Rm: 3, c: 2.}
+      - script: pip
+        parameters: {alphas: [0.5], cs: [0.5, 2.]}
+        output: pip_alpha_half
+
+Every key but runs is optional, and so are the parameters and the output directory of
+a run, which is relative to that of the batch.
+"""
+
+import ast
+import json
+import os
+
+
+BATCH_KEYS = ('output', 'formats', 'profile', 'workers', 'runs')
+
+RUN_KEYS = ('script', 'parameters', 'output')
+
+
+def script_parameters(**defaults):
+    """
+    The parameters of a script as a dict: defaults, overridden by the values in
+    SOCIALITY_PARAMETERS. Raises ValueError for a parameter the script does not have.
+    """
+    overrides = json.loads(os.environ.get('SOCIALITY_PARAMETERS') or '{}')
+    unknown = sorted(set(overrides) - set(defaults))
+    if unknown:
+        raise ValueError("Unknown parameters {}, expected some of {}".format(
+            unknown, sorted(defaults)))
+    parameters = dict(defaults)
+    parameters.update(overrides)
+    return parameters
+
+
+def parse_value(text):
+    """
+    The value of a parameter given as text: a JSON value or Python literal such as 4,
+    2., 0.5 or [1, 2], or otherwise the text itself.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def load_batch(path):
+    """
+    The batch file path, JSON or YAML by its extension, as a dict. Raises ValueError
+    for a key that batch files do not have or a run without a script.
+    """
+    with open(path) as batch_file:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading the YAML batch file {} needs PyYAML".format(path))
+            batch = yaml.safe_load(batch_file)
+        else:
+            batch = json.load(batch_file)
+
+    batch = batch or {}
+    unknown = sorted(set(batch) - set(BATCH_KEYS))
+    if unknown:
+        raise ValueError("Unknown keys {} in {}, expected some of {}".format(
+            unknown, path, list(BATCH_KEYS)))
+    for run in batch.get('runs') or []:
+        unknown = sorted(set(run) - set(RUN_KEYS))
+        if unknown or 'script' not in run:
+            raise ValueError("Each run in {} needs a script, and may have only {}".format(
+                path, list(RUN_KEYS)))
+    return batch
@@ -0,0 +1,241 @@
+"""
+Pseudo-arclength continuation of the endemic equilibrium of the two-type contagion.
+
+The steady state (Im, Ir) of one contagion is followed as a curve in (Im, Ir, lambda),
+where lambda is one of the parameters f, Rm, Rr or c. Each step predicts along the
+tangent of the curve and corrects with Newton's method on the steady-state equations
+augmented by the arclength condition, so the branch is traced with a handful of linear
+solves per point instead of a fresh solve at every grid value. The step length grows
+while the corrector converges quickly and is halved when it struggles.
+
+The endemic branch meets the disease-free branch Im = Ir = 0 in a transcritical
+bifurcation where $R_{net}$ (the Locus of stabilityregionfigure.py) crosses 1. Since
+$R_{net}$ is known in closed form, these points are located to machine precision by a
+scalar root find, and the disease-free branch, which is the long-time state on the
+other side, is followed until $R_{net}$ rises above 1 again.
+"""
+
+import collections
+
+import numpy as np
+from scipy.optimize import brentq
+
+from sociality.contagion import (Im_righthand, Ir_righthand, contagion_jacobian,
+                                 contagion_f_derivative, contagion_R_derivative)
+from sociality.equilibrium import R_net, endemic_equilibrium
+
+
+PARAMETERS = ('f', 'Rm', 'Rr', 'c')
+
+Branch = collections.namedtuple(
+    'Branch', ['parameter', 'values', 'Im', 'Ir', 'transcritical', 'n_steps', 'n_solves'])
+
+
+class _Contagion(object):
+    """
+    Steady-state equations of one contagion as functions of (Im, Ir) and the continued
+    parameter. The bad contagion (contagion='bad') spreads with rates c Rm and c Rr;
+    for the good contagion c has no effect.
+    """
+
+    def __init__(self, parameter, Rm, Rr, f, c, contagion):
+        if parameter not in PARAMETERS:
+            raise ValueError("parameter must be one of {}".format(PARAMETERS))
+        if contagion not in ('good', 'bad'):
+            raise ValueError("contagion must be 'good' or 'bad'")
+        if parameter == 'c' and contagion == 'good':
+            raise ValueError("the good contagion does not depend on c")
+        self.parameter = parameter
+        self.fixed = {'Rm': float(Rm), 'Rr': float(Rr), 'f': float(f), 'c': float(c)}
+        self.bad = contagion == 'bad'
+
+    def rates(self, value):
+        """
+        Effective (Rm, Rr, f) at parameter value.
+        """
+        p = dict(self.fixed)
+        p[self.parameter] = value
+        scale = p['c'] if self.bad else 1.
+        return scale * p['Rm'], scale * p['Rr'], p['f']
+
+    def R_net(self, value):
+        return R_net(*self.rates(value))
+
+    def residual(self, u):
+        Rm, Rr, f = self.rates(u[2])
+        return np.array([Im_righthand(Rm, Rr, f, u[0], u[1]),
+                         Ir_righthand(Rm, Rr, f, u[0], u[1])])
+
+    def jacobian(self, u):
+        """
+        Derivatives of the residual with respect to (Im, Ir, parameter), as a 2 x 3
+        matrix.
+        """
+        Rm, Rr, f = self.rates(u[2])
+        J11, J12, J21, J22 = contagion_jacobian(Rm, Rr, f, u[0], u[1])
+
+        if self.parameter == 'f':
+            dIm, dIr = contagion_f_derivative(Rm, Rr, f, u[0], u[1])
+        else:
+            dIm_dRm, dIr_dRm, dIm_dRr, dIr_dRr = contagion_R_derivative(
+                Rm, Rr, f, u[0], u[1])
+            scale = self.fixed['c'] if self.bad else 1.
+            if self.parameter == 'Rm':
+                dIm, dIr = scale * dIm_dRm, scale * dIr_dRm
+            elif self.parameter == 'Rr':
+                dIm, dIr = scale * dIm_dRr, scale * dIr_dRr
+            else:
+                dIm = (self.fixed['Rm'] * dIm_dRm + self.fixed['Rr'] * dIm_dRr)
+                dIr = (self.fixed['Rm'] * dIr_dRm + self.fixed['Rr'] * dIr_dRr)
+
+        return np.array([[J11, J12, dIm], [J21, J22, dIr]])
+
+
+def _tangent(model, u, previous):
+    """
+    Unit tangent of the branch at u, oriented to agree with the previous tangent.
+    """
+    A = np.vstack([model.jacobian(u), previous])
+    t = np.linalg.solve(A, np.array([0., 0., 1.]))
+    return t / np.linalg.norm(t)
+
+
+def _correct(model, prediction, tangent, tol, max_iter):
+    """
+    Newton's method for the steady-state equations together with the condition that
+    the correction is orthogonal to the tangent. Returns the corrected point (or None
+    if Newton's method fails) and the number of iterations used.
+    """
+    u = prediction.copy()
+    for iteration in range(1, max_iter + 1):
+        G = np.append(model.residual(u), tangent.dot(u - prediction))
+        A = np.vstack([model.jacobian(u), tangent])
+        try:
+            step = np.linalg.solve(A, -G)
+        except np.linalg.LinAlgError:
+            return None, iteration
+        u += step
+        if not np.all(np.isfinite(u)):
+            return None, iteration
+        if np.max(np.abs(step)) <= tol * max(1., abs(u[2])):
+            return u, iteration
+    return None, max_iter
+
+
+def _crossing(model, a, b):
+    """
+    The parameter value between a and b at which R_net crosses 1.
+    """
+    return brentq(lambda value: model.R_net(value) - 1., a, b, xtol=1e-15, rtol=1e-15)
+
+
+def continue_equilibrium(parameter, start, stop, Rm, Rr, f, c=1.,
+                         contagion='good',
+                         ds=0.01,
+                         ds_min=1e-8,
+                         ds_max=0.5,
+                         tol=1e-12,
+                         max_iter=8,
+                         max_steps=100000,
+                         n_scan=200):
+    """
+    Follow the long-time state of one contagion as parameter ('f', 'Rm', 'Rr' or 'c')
+    runs from start to stop, with the other parameters held at the given values.
+
+    On the endemic branch the arclength step ds adapts between ds_min and ds_max: it
+    grows by half after corrections that take at most three Newton iterations, and
+    halves whenever Newton's method fails to reach tol within max_iter iterations.
+    On the disease-free branch R_net is sampled at n_scan points to bracket the next
+    crossing of the threshold. Returns a Branch with the visited parameter values and
+    states (the transcritical points included) and the parameter values at which
+    R_net = 1.
+    """
+    model = _Contagion(parameter, Rm, Rr, f, c, contagion)
+    start, stop = float(start), float(stop)
+    direction = 1. if stop >= start else -1.
+
+    def passed(value):
+        return direction * (value - stop) >= 0
+
+    values, Im, Ir, transcritical = [start], [], [], []
+    tangent = None
+    n_steps = n_solves = 0
+
+    Im0, Ir0 = endemic_equilibrium(*model.rates(start))
+    Im.append(float(Im0))
+    Ir.append(float(Ir0))
+    endemic = model.R_net(start) > 1.
+
+    while not passed(values[-1]) and n_steps < max_steps:
+        if not endemic:
+            # Follow the disease-free branch up to the next threshold crossing.
+            scan = np.linspace(values[-1], stop, n_scan + 1)
+            above = np.array([model.R_net(value) > 1. for value in scan])
+            if not above[1:].any():
+                values.append(stop)
+                Im.append(0.)
+                Ir.append(0.)
+                break
+            k = np.argmax(above[1:]) + 1
+            threshold = _crossing(model, scan[k - 1], scan[k])
+            transcritical.append(threshold)
+            values.append(threshold)
+            Im.append(0.)
+            Ir.append(0.)
+
+            # Restart on the endemic branch just past the threshold.
+            restart = threshold + direction * min(ds, abs(scan[k] - threshold))
+            Im0, Ir0 = endemic_equilibrium(*model.rates(restart))
+            values.append(restart)
+            Im.append(float(Im0))
+            Ir.append(float(Ir0))
+            endemic = True
+            tangent = None
+            continue
+
+        u = np.array([Im[-1], Ir[-1], values[-1]])
+        if tangent is None:
+            tangent = _tangent(model, u, np.array([0., 0., direction]))
+        else:
+            tangent = _tangent(model, u, tangent)
+
+        while True:
+            corrected, iterations = _correct(model, u + ds * tangent, tangent, tol,
+                                             max_iter)
+            n_solves += iterations
+            if corrected is not None:
+                break
+            ds *= 0.5
+            if ds < ds_min:
+                raise RuntimeError(
+                    "continuation stalled at {} = {}".format(parameter, u[2]))
+        n_steps += 1
+
+        if iterations <= 3:
+            ds = min(1.5 * ds, ds_max)
+
+        if passed(corrected[2]):
+            Im0, Ir0 = endemic_equilibrium(*model.rates(stop))
+            if model.R_net(stop) > 1.:
+                values.append(stop)
+                Im.append(float(Im0))
+                Ir.append(float(Ir0))
+                break
+            corrected = np.array([Im0, Ir0, stop], dtype=float)
+
+        if model.R_net(corrected[2]) <= 1.:
+            # The branch has run into the disease-free state.
+            threshold = _crossing(model, u[2], corrected[2])
+            transcritical.append(threshold)
+            values.append(threshold)
+            Im.append(0.)
+            Ir.append(0.)
+            endemic = False
+            continue
+
+        values.append(corrected[2])
+        Im.append(corrected[0])
+        Ir.append(corrected[1])
+
+    return Branch(parameter, np.array(values), np.array(Im), np.array(Ir),
+                  np.array(transcritical), n_steps, n_solves)
@@ -0,0 +1,221 @@
+"""
+The social dilemma under Cobb-Douglas and CES utility, on arbitrary grids of (alpha, c).
+
+For every weight alpha on the good contagion and relative infectiousness c of the bad
+contagion this evaluates the evolutionarily-stable sociality R_ESS, the socially-optimal
+sociality R_opt, the utilities of monomorphic populations playing either, and the Price
+of Anarchy U(R_ESS) / U(R_opt). Everything is vectorized and evaluated in chunks, so
+grids of 10^7 points and more are handled without large temporaries.
+
+The surfaces are piecewise: R_opt switches branch at alpha = 1 - c, R_ESS leaves 1 at
+alpha = 1 - c / (2c - 1), and the utilities jump at alpha = 0, where the convention
+0^0 = 1 keeps the good contagion's factor at 1 although Ig = 0. alpha_curve places
+these points, together with their one-sided limits, on the alpha axis, so that curves
+drawn from it show the kinks and jumps at their exact positions.
+
+ces_surfaces evaluates the same quantities under CES utility with substitution
+parameter rho, for which the ESS is found numerically; sociality.atlas tabulates them
+over (alpha, c, rho) on disk.
+"""
+
+import collections
+
+import numpy as np
+
+from sociality.cache import memoize
+from sociality.optimum import (social_optimum_cd, social_optimum_ces,
+                               monomorphic_log_utility)
+
+
+"""
+Distance from a breakpoint at which its one-sided limits are evaluated. Much closer
+points lose the limits to rounding (at alpha = 1e-300, R_opt = 1/(1 - alpha) rounds to
+1 and its utility to 0).
+"""
+LIMIT_OFFSET = 1e-9
+
+DilemmaSurfaces = collections.namedtuple(
+    'DilemmaSurfaces', ['R_ESS', 'R_opt', 'U_ESS', 'U_opt', 'PoA'])
+
+
+def ess_interior_cd(alpha, c):
+    """
+    Interior branch 1/c + alpha / (1 - alpha) of the Cobb-Douglas ESS, which is the ESS
+    where it is at least 1.
+    """
+    return 1. / c + alpha / (1. - alpha)
+
+
+def ess_cd(alpha, c):
+    """
+    Evolutionarily-stable sociality under Cobb-Douglas utility.
+    """
+    alpha, c = np.asarray(alpha, dtype=float), np.asarray(c, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.maximum(1., ess_interior_cd(alpha, c))
+
+
+def ess_linear(alpha, c):
+    """
+    Evolutionarily-stable sociality under linear utility (CES with rho = 1), for which
+    the selection gradient has the sign of a linear function of R. Where the gradient
+    increases with R its zero is repelling, and the result is max(1, 1/c) or infinite
+    according to the sign of the gradient there, as for ess_ces.
+    """
+    alpha, c = np.asarray(alpha, dtype=float), np.asarray(c, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        R_low = np.maximum(1., 1. / c)
+        slope = alpha - (1. - alpha) / c
+        intercept = (1. - alpha) / c ** 2 - alpha
+        R_root = -intercept / slope
+    grows = slope * R_low + intercept > 0
+    return np.where(~grows, R_low, np.where(slope >= 0, np.inf, R_root))
+
+
+def ces_gradient_sign(R, alpha, c, rho):
+    """
+    A function with the sign of the selection gradient on R in a monomorphic population
+    under CES utility, for R >= max(1, 1/c): the log-ratio of
+    alpha (R - 1)^rho and (1 - alpha) c^-(1 + rho) (cR - 1). cR - 1 is clipped at zero,
+    since R = 1/c may round to just below the threshold.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        good = np.log(alpha) + np.where(rho == 0, 0., rho * np.log(R - 1.))
+        bad = (np.log(1. - alpha) - (1. + rho) * np.log(c) +
+               np.log(np.maximum(c * R - 1., 0.)))
+        return good - bad
+
+
+def ess_ces(alpha, c, rho, R_cap=1e12, n_grid=256, n_iter=64):
+    """
+    Evolutionarily-stable sociality under CES utility, vectorized over broadcast
+    arguments: the first zero of the selection gradient above R_low = max(1, 1/c) at
+    which it changes from positive to negative, for every rho. The gradient may change
+    sign several times (it is concave in R for 0 < rho < 1, and may turn negative and
+    then positive again for rho > 1), so the zero is bracketed by a scan of n_grid
+    points spaced logarithmically in R - R_low up to R_cap, and then found by
+    bisection. The result is R_low if the gradient is negative there, and infinite if
+    it stays positive up to R_cap.
+    """
+    alpha, c, rho = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                          for x in (alpha, c, rho)])
+    with np.errstate(divide='ignore'):
+        R_low = np.maximum(1., 1. / c)
+
+    grows = ces_gradient_sign(R_low, alpha, c, rho) > 0
+    bracketed = np.zeros(alpha.shape, dtype=bool)
+    lower = R_low
+    upper = R_low
+    previous = R_low
+    for offset in np.geomspace(1e-6, R_cap, n_grid):
+        R = R_low + offset
+        crossed = grows & ~bracketed & ~(ces_gradient_sign(R, alpha, c, rho) > 0)
+        lower = np.where(crossed, previous, lower)
+        upper = np.where(crossed, R, upper)
+        bracketed |= crossed
+        previous = R
+
+    for iteration in range(n_iter):
+        middle = 0.5 * (lower + upper)
+        positive = ces_gradient_sign(middle, alpha, c, rho) > 0
+        lower = np.where(positive, middle, lower)
+        upper = np.where(positive, upper, middle)
+
+    return np.where(~grows, R_low,
+                    np.where(bracketed, 0.5 * (lower + upper), np.inf))
+
+
+def monomorphic_utility_cd(alpha, c, R_mono):
+    """
+    Cobb-Douglas utility of a monomorphic population with reproduction number R_mono.
+    """
+    with np.errstate(divide='ignore'):
+        Ig = np.maximum(1. - 1. / R_mono, 0.)
+        Sb = np.minimum(1. / (c * R_mono), 1.)
+    return (Ig ** alpha) * (Sb ** (1. - alpha))
+
+
+def _surfaces(alpha, c):
+    R_ESS = ess_cd(alpha, c)
+    R_opt = social_optimum_cd(alpha, c)
+    U_ESS = monomorphic_utility_cd(alpha, c, R_ESS)
+    U_opt = monomorphic_utility_cd(alpha, c, R_opt)
+    return R_ESS, R_opt, U_ESS, U_opt, U_ESS / U_opt
+
+
+def ces_surfaces(alpha, c, rho):
+    """
+    R_ESS, R_opt, their utilities and the Price of Anarchy under CES utility with
+    substitution parameter rho, at broadcast (alpha, c, rho).
+    """
+    R_ESS = ess_ces(alpha, c, rho)
+    R_opt = social_optimum_ces(alpha, c, rho)
+    log_U_ESS = monomorphic_log_utility(R_ESS, alpha, c, rho)
+    log_U_opt = monomorphic_log_utility(R_opt, alpha, c, rho)
+    with np.errstate(invalid='ignore'):
+        PoA = np.exp(log_U_ESS - log_U_opt)
+    return DilemmaSurfaces(R_ESS, R_opt, np.exp(log_U_ESS), np.exp(log_U_opt), PoA)
+
+
+def dilemma_surfaces(alpha, c, chunk_size=2 ** 20):
+    """
+    R_ESS, R_opt, their utilities and the Price of Anarchy at broadcast (alpha, c), as
+    a DilemmaSurfaces of arrays with the broadcast shape. The points are processed
+    chunk_size at a time.
+    """
+    alpha, c = np.broadcast_arrays(np.asarray(alpha, dtype=float),
+                                   np.asarray(c, dtype=float))
+    shape = alpha.shape
+    alpha, c = alpha.ravel(), c.ravel()
+
+    result = [np.empty(alpha.size) for field in DilemmaSurfaces._fields]
+    for start in range(0, alpha.size, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        for out, values in zip(result, _surfaces(alpha[chunk], c[chunk])):
+            out[chunk] = values
+
+    return DilemmaSurfaces(*[out.reshape(shape) for out in result])
+
+
+def alpha_breakpoints(c):
+    """
+    Values of alpha in [0, 1) at which the surfaces for relative infectiousness c are
+    kinked or discontinuous.
+    """
+    points = [0.]
+    if c < 1.:
+        points.append(1. - c)
+    elif c > 1.:
+        points.append(1. - c / (2. * c - 1.))
+    return points
+
+
+def alpha_curve(alpha, c):
+    """
+    The surfaces along a 1-D grid of alpha values at a single c, with the breakpoints
+    of alpha_breakpoints(c) and points LIMIT_OFFSET to either side of them added to the
+    grid. Returns the refined alpha values and a DilemmaSurfaces along them.
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    extra = []
+    for point in alpha_breakpoints(c):
+        extra.extend([point - LIMIT_OFFSET, point, point + LIMIT_OFFSET])
+    extra = np.array(extra)
+    extra = extra[(extra >= alpha.min()) & (extra <= alpha.max())]
+
+    refined = np.union1d(alpha, extra)
+    return refined, dilemma_surfaces(refined, c)
+
+
+@memoize
+def _cached_alpha_curve(alpha, c):
+    refined, surfaces = alpha_curve(alpha, c)
+    return (refined,) + tuple(surfaces)
+
+
+def cached_alpha_curve(alpha, c):
+    """
+    alpha_curve, cached across runs.
+    """
+    refined, *surfaces = _cached_alpha_curve(alpha, c)
+    return refined, DilemmaSurfaces(*surfaces)
@@ -0,0 +1,102 @@
+"""
+Direct computation of the long-time state of the two-type contagion dynamics.
+
+At a steady state both strategies feel the same weight (force of infection) $W$, so that
+Im = Rm W / (1 + Rm W) and Ir = Rr W / (1 + Rr W). Substituting these back into the
+definition of the weight reduces the two-dimensional problem to the scalar equation
+
+    g(W) = (1-f) Rr^2 / (1 + Rr W) + f Rm^2 / (1 + Rm W) - (Rr (1-f) + Rm f) = 0,
+
+which has a positive root exactly when $R_{net} > 1$. The function g is decreasing and
+convex, so Newton's method started from W = 0 increases monotonically to the root and
+never overshoots. By the result of Hethcote and Yorke this root gives the unique
+long-time state reached by the time-stepping in replicator_equation.py.
+"""
+
+import numpy as np
+
+from sociality.cache import memoize
+from sociality.contagion import contagion_pair, integrate
+
+
+def R_net(Rm, Rr, f):
+    """
+    Basic reproduction number of the two-type contagion dynamics.
+    """
+    return (f * Rm ** 2 + (1 - f) * Rr ** 2) / (f * Rm + (1 - f) * Rr)
+
+def weight_equation(W, Rm, Rr, f):
+    """
+    The scalar steady-state equation g(W) and its derivative g'(W).
+    """
+    mut_term = f * Rm ** 2 / (1 + Rm * W)
+    res_term = (1 - f) * Rr ** 2 / (1 + Rr * W)
+    g = mut_term + res_term - (Rr * (1 - f) + Rm * f)
+    dg = -mut_term * Rm / (1 + Rm * W) - res_term * Rr / (1 + Rr * W)
+    return g, dg
+
+
+def endemic_weight(Rm, Rr, f, tol=1e-13, max_iter=100):
+    """
+    Solve g(W) = 0 by Newton's method, vectorized over broadcast (Rm, Rr, f). Returns
+    the weight W (zero at the disease-free equilibrium) and a boolean array marking the
+    entries that converged.
+    """
+    Rm, Rr, f = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                      for x in (Rm, Rr, f)])
+    W = np.zeros(Rm.shape)
+    active = np.asarray(weight_equation(W, Rm, Rr, f)[0] > 0)
+
+    for iteration in range(max_iter):
+        if not active.any():
+            break
+        g, dg = weight_equation(W[active], Rm[active], Rr[active], f[active])
+        step = -g / dg
+        W[active] += step
+        still_active = ~(np.abs(step) <= tol * np.maximum(1, W[active]))
+        active[active] = still_active
+
+    return W, ~active
+
+
+def endemic_equilibrium(Rm, Rr, f,
+                        tol=1e-13,
+                        max_iter=100,
+                        **kwargs):
+    """
+    Long-time state (Im, Ir) of a single contagion, vectorized over broadcast
+    (Rm, Rr, f). Entries for which Newton's method does not converge are integrated
+    forward in time instead, with keyword arguments passed on to contagion.integrate.
+    """
+    W, converged = endemic_weight(Rm, Rr, f, tol=tol, max_iter=max_iter)
+    Rm, Rr, f = np.broadcast_arrays(Rm, Rr, f)
+
+    Im = np.asarray(Rm * W / (1 + Rm * W))
+    Ir = np.asarray(Rr * W / (1 + Rr * W))
+
+    if not converged.all():
+        failed = ~converged
+        solution = integrate(Rm[failed], Rr[failed], f[failed], 0.5, 0.5, **kwargs)
+        Im[failed], Ir[failed] = solution.Im, solution.Ir
+
+    return Im, Ir
+
+
+def equilibrium_sweep(Rm, Rr, c, f_range, **kwargs):
+    """
+    Long-time states (Img, Irg, Imb, Irb) of the good and bad contagion, vectorized over
+    broadcast (Rm, Rr, c, f_range). A drop-in replacement for time-stepping with
+    contagion.integrate_sweep.
+    """
+    Rm_pair, Rr_pair, f_pair = contagion_pair(Rm, Rr, c, f_range)
+    Im, Ir = endemic_equilibrium(Rm_pair, Rr_pair, f_pair, **kwargs)
+    return Im[0], Ir[0], Im[1], Ir[1]
+
+
+@memoize
+def cached_equilibrium_sweep(Rm, Rr, c, f_range, **kwargs):
+    """
+    equilibrium_sweep, cached across runs. Being a module-level function it can also be
+    handed to worker processes, which leave their results in the shared on-disk cache.
+    """
+    return equilibrium_sweep(Rm, Rr, c, f_range, **kwargs)
@@ -0,0 +1,35 @@
+"""
+Grids and default parameters shared by the figure scripts and the compute stages of
+render_figures.py.
+
+The compute stages fill the cache with the results the scripts then ask for, so both
+must call the cached functions with the same arguments. Defining the grids and defaults
+once, here, keeps the cache keys of the two in step.
+"""
+
+import numpy as np
+
+
+"""
+Mutant fractions of the sweep of replicator_equation.py (Figures 2 and 5): f = 0 and the
+grid of step F_STEP up to 1.
+"""
+F_STEP = 0.01
+F_SWEEP = np.concatenate([[0.], np.arange(F_STEP, 1.0 + F_STEP, F_STEP)])
+
+"""
+Default parameters of replicator_equation.py: relative infectiousness c, weight alpha
+on the good contagion, sociality strategies of the resident and mutant type, and initial
+conditions of the two contagions.
+"""
+REPLICATOR_DEFAULTS = {'c': 4., 'alpha': 0.75, 'Rr': 4, 'Rm': 3,
+                       'Img0': 0.2, 'Irg0': 0.8, 'Imb0': 0.2, 'Irb0': 0.2}
+
+"""
+Axis of alpha of socialdilemma.py (Figures 3c, 6 and 7), up to ALPHA_MAX in steps of
+ALPHA_STEP, and the values of c of its curves.
+"""
+ALPHA_MAX = .875
+ALPHA_STEP = 0.01
+ALPHA_AXIS = np.arange(0.0, ALPHA_MAX + ALPHA_STEP, ALPHA_STEP)
+DILEMMA_CS = (1., 2., 0.5)
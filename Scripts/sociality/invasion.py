@@ -0,0 +1,550 @@
+"""
+Invasion fitness of a rare mutant in the adaptive dynamics of sociality.
+
+The endemic equilibria reached by a common resident and a rare mutant, as functions of
+their reproduction numbers, determine the Cobb-Douglas, linear or CES fitness of each.
+A mutant can invade when its fitness exceeds the resident's, and pairwise invasibility
+plots (PIPs) classify every (resident, mutant) pair of a grid.
+
+Very fine PIPs are computed tile by tile into a preallocated uint8 array (or a
+bit-packed one), so that memory use is bounded by the tile size rather than by the grid.
+Tiles are independent and can be evaluated on several threads; numpy releases the
+interpreter lock inside the elementwise operations that dominate the work.
+
+Since a PIP only carries information where the classification changes, it can also be
+drawn from those boundaries alone: invasion_boundary locates them column by column with
+a coarse scan along the mutant axis and vectorized bisection, at a small fraction of the
+evaluations of the full grid, and the regions between them are filled.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import threading
+
+import numpy as np
+
+from sociality.cache import memoize
+from sociality.workers import worker_budget
+
+
+"""
+Values of the invasion classification: the mutant cannot invade, the mutant can invade
+(but the resident could not invade the mutant), or each can invade the other.
+"""
+NO_INVASION = 0
+INVASION = 1
+MUTUAL_INVASION = 2
+
+
+"""
+Defining the endemic equilbria achieved for the resident and mutant populations in the
+presence of a rare mutant (as a function of the reproduction numbers for the two
+types).
+"""
+
+def Ig_r(R_res):
+    return np.maximum(0, 1 - 1 / R_res)
+
+def Ig_m(R_res, R_mut):
+    return np.maximum(
+        0, (R_mut * (R_res - 1)) / (R_res + R_mut * (R_res - 1)))
+
+def Sb_r(R_res, c):
+    return np.minimum(1, 1 / (c * R_res))
+
+def Sb_m(R_res, R_mut, c):
+    return R_res / (R_res + R_mut * (np.maximum(1, c * R_res) - 1))
+
+
+"""
+Defining the Cobb-Douglas, linear, and Constant Elasticity of Substitution (CES) utility
+functions in terms of the endemic equilibria for the two contagions.
+"""
+
+def log_cd_fitness(Ig, Sb, alpha):
+    return (alpha * np.log(Ig) +
+            (1 - alpha) * np.log(Sb))
+
+def linear_fitness(Ig, Sb, alpha):
+    return np.array((alpha * Ig +
+                     (1 - alpha) * Sb))
+
+
+def log_ces_fitness(Ig, Sb, alpha, rho=1):
+    return np.array((1 / rho) * np.log(
+        alpha * np.power(Ig, rho)
+        + (1 - alpha) * np.power(Sb, rho)))
+
+def fitness(Ig, Sb, alpha, fitness_func='cd', **kwargs):
+    funcs = {'linear': linear_fitness,
+             'cd': log_cd_fitness,
+             'ces': log_ces_fitness}
+
+    return funcs[fitness_func](Ig, Sb, alpha, **kwargs)
+
+
+"""
+Charaterizing the criterion for when a rare mutant can invade a common resident.
+"""
+
+def invasion_fitness(R_res, R_mut, alpha, c,
+                     fitness_func='cd',
+                     **kwargs):
+    """
+    Difference between the fitness of a rare mutant and that of the resident.
+    """
+    mut_fitness = fitness(
+        Ig_m(R_res, R_mut),
+        Sb_m(R_res, R_mut, c),
+        alpha,
+        fitness_func=fitness_func,
+        **kwargs)
+
+    res_fitness = fitness(
+        Ig_r(R_res),
+        Sb_r(R_res, c),
+        alpha,
+        fitness_func=fitness_func,
+        **kwargs)
+
+    return mut_fitness - res_fitness
+
+
+def can_invade(R_res, R_mut, alpha, c,
+               fitness_func='cd',
+               **kwargs):
+    return invasion_fitness(R_res, R_mut, alpha, c, fitness_func, **kwargs) > 0
+
+
+def _axis_vectors(R_res, R_mut):
+    """
+    For a meshgrid (resident values along rows, mutant values down columns), its first
+    row and column, which broadcast back to the full grid. Other arrays are returned
+    unchanged.
+    """
+    R_res, R_mut = np.asarray(R_res), np.asarray(R_mut)
+    if (R_res.ndim == 2 and R_res.shape == R_mut.shape and
+            np.all(R_res == R_res[:1]) and np.all(R_mut == R_mut[:, :1])):
+        return R_res[:1], R_mut[:, :1]
+    return R_res, R_mut
+
+
+def _is_symmetric(R_res, R_mut):
+    """
+    Whether swapping the resident and mutant values transposes the grid, so that the
+    resident invading the mutant is the transpose of the mutant invading the resident.
+    """
+    return (R_res.ndim == 2 and R_res.shape[::-1] == R_mut.shape and
+            np.array_equal(R_res, R_mut.T))
+
+
+def can_mutually_invade(R_res, R_mut, alpha, c,
+                        fitness_func='cd',
+                        **kwargs):
+    R_res, R_mut = _axis_vectors(R_res, R_mut)
+    mut_inv_res = can_invade(R_res, R_mut, alpha, c,
+                             fitness_func,
+                             **kwargs)
+    if _is_symmetric(R_res, R_mut):
+        res_inv_mut = mut_inv_res.T
+    else:
+        res_inv_mut = can_invade(R_mut, R_res, alpha, c,
+                                 fitness_func,
+                                 **kwargs)
+
+    return 1.0 * mut_inv_res + (mut_inv_res * res_inv_mut)
+
+
+"""
+Tiled evaluation of the invasion classification on large grids.
+"""
+
+def invasion_tile(res_points, mut_points, alpha, c,
+                  fitness_func='cd',
+                  mutual=True,
+                  **kwargs):
+    """
+    Invasion classification as a uint8 array of shape (mut_points.size,
+    res_points.size), computed from the 1-D axis vectors by broadcasting.
+    """
+    R_res = np.asarray(res_points, dtype=float)[None, :]
+    R_mut = np.asarray(mut_points, dtype=float)[:, None]
+
+    tile = can_invade(R_res, R_mut, alpha, c, fitness_func, **kwargs).view(np.uint8)
+    if mutual:
+        tile = tile + (tile & can_invade(R_mut, R_res, alpha, c, fitness_func,
+                                         **kwargs))
+    return tile
+
+
+def packed_shape(n_mut, n_res, mutual=True):
+    """
+    Shape of the bit-packed classification of an n_mut x n_res grid: one bit plane
+    marking invasion, and for mutual classifications a second marking mutual invasion,
+    each packed along the resident axis.
+    """
+    shape = (n_mut, (n_res + 7) // 8)
+    return (2,) + shape if mutual else shape
+
+
+def unpack(packed, n_res, mutual=True):
+    """
+    The uint8 classification of a bit-packed one.
+    """
+    bits = np.unpackbits(packed, axis=-1, count=n_res)
+    return bits[0] + bits[1] if mutual else bits
+
+
+def tiled_invasion_map(res_points, mut_points, alpha, c,
+                       fitness_func='cd',
+                       mutual=True,
+                       tile_size=1024,
+                       n_workers=None,
+                       packed=False,
+                       out=None,
+                       cancel=None,
+                       **kwargs):
+    """
+    Invasion classification on the grid of resident (columns) and mutant (rows)
+    reproduction numbers given by the 1-D arrays res_points and mut_points, computed in
+    tiles of at most tile_size x tile_size points on n_workers threads (by default the
+    worker budget of sociality.workers).
+
+    The result is written into out if given (which may be a memory-mapped array), and
+    otherwise into a new array. It is a uint8 array of shape (mut_points.size,
+    res_points.size) with values NO_INVASION, INVASION or MUTUAL_INVASION or, if packed,
+    a bit-packed array of shape packed_shape(...) that unpack turns back into one.
+    If cancel (a threading.Event) is set during the computation, the remaining tiles
+    are skipped and the result is incomplete.
+    """
+    res_points = np.asarray(res_points, dtype=float)
+    mut_points = np.asarray(mut_points, dtype=float)
+    n_mut, n_res = mut_points.size, res_points.size
+    if packed:
+        tile_size = max(8, tile_size - tile_size % 8)
+        shape = packed_shape(n_mut, n_res, mutual)
+    else:
+        shape = (n_mut, n_res)
+
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array of shape {}".format(shape))
+    if n_workers is None:
+        n_workers = worker_budget()
+
+    def store(i, j, tile):
+        if not packed:
+            out[i:i + tile_size, j:j + tile_size] = tile
+            return
+        columns = slice(j // 8, (j + tile.shape[1] + 7) // 8)
+        if mutual:
+            out[0, i:i + tile_size, columns] = np.packbits(tile > 0, axis=-1)
+            out[1, i:i + tile_size, columns] = np.packbits(tile > 1, axis=-1)
+        else:
+            out[i:i + tile_size, columns] = np.packbits(tile, axis=-1)
+
+    def evaluate(corner):
+        if cancel is not None and cancel.is_set():
+            return
+        i, j = corner
+        store(i, j, invasion_tile(res_points[j:j + tile_size],
+                                  mut_points[i:i + tile_size],
+                                  alpha, c, fitness_func, mutual, **kwargs))
+
+    def evaluate_pair(corner):
+        """
+        Tiles (i, j) and (j, i) of a symmetric grid, from one-way invasion of each.
+        """
+        if cancel is not None and cancel.is_set():
+            return
+        i, j = corner
+        forward = invasion_tile(res_points[j:j + tile_size],
+                                mut_points[i:i + tile_size],
+                                alpha, c, fitness_func, mutual=False, **kwargs)
+        if i == j:
+            store(i, j, forward + (forward & forward.T))
+            return
+        backward = invasion_tile(res_points[i:i + tile_size],
+                                 mut_points[j:j + tile_size],
+                                 alpha, c, fitness_func, mutual=False, **kwargs)
+        store(i, j, forward + (forward & backward.T))
+        store(j, i, backward + (backward & forward.T))
+
+    if mutual and np.array_equal(res_points, mut_points):
+        corners = [(i, j) for i in range(0, n_mut, tile_size)
+                   for j in range(i, n_res, tile_size)]
+        evaluate = evaluate_pair
+    else:
+        corners = list(itertools.product(range(0, n_mut, tile_size),
+                                         range(0, n_res, tile_size)))
+    if n_workers == 1 or len(corners) == 1:
+        for corner in corners:
+            evaluate(corner)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(n_workers) as executor:
+            list(executor.map(evaluate, corners))
+
+    return out
+
+
+"""
+Incremental evaluation of the invasion classification for interactive use.
+"""
+
+@memoize
+def cached_invasion_map(res_points, mut_points, alpha, c,
+                        fitness_func='cd',
+                        mutual=True,
+                        **kwargs):
+    """
+    tiled_invasion_map, cached across runs by parameters and grid. Being a module-level
+    function it can also be handed to worker processes, which leave their results in
+    the shared on-disk cache.
+    """
+    return tiled_invasion_map(res_points, mut_points, alpha, c,
+                              fitness_func=fitness_func,
+                              mutual=mutual,
+                              **kwargs)
+
+
+def _fitness_parts(fitness_func='cd', rho=1):
+    """
+    The fitness functions written as combine(alpha, transform(Ig), transform(Sb)), so
+    that the transformed equilibria can be computed ahead of alpha.
+    """
+    def weighted(alpha, Ig, Sb):
+        return alpha * Ig + (1 - alpha) * Sb
+
+    if fitness_func == 'cd':
+        return np.log, weighted
+    if fitness_func == 'linear':
+        return (lambda x: x), weighted
+    if fitness_func == 'ces':
+        return ((lambda x: np.power(x, rho)),
+                (lambda alpha, Ig, Sb: (1 / rho) * np.log(weighted(alpha, Ig, Sb))))
+    raise KeyError(fitness_func)
+
+
+class InvasionMapper(object):
+    """
+    Invasion classification on a fixed grid of resident (columns) and mutant (rows)
+    reproduction numbers, for changing alpha and c. The transformed Ig terms, which
+    depend only on the grid, are computed once. A new c recomputes only the Sb terms,
+    and a new alpha only their weighted combination. Calling the mapper with (alpha, c)
+    returns the same uint8 classification as tiled_invasion_map.
+    """
+
+    def __init__(self, res_points, mut_points, fitness_func='cd', mutual=True,
+                 **kwargs):
+        self.transform, self.combine = _fitness_parts(fitness_func, **kwargs)
+        R_res = np.asarray(res_points, dtype=float)[None, :]
+        R_mut = np.asarray(mut_points, dtype=float)[:, None]
+
+        # (resident, mutant) roles: the mutant invading, then the resident invading.
+        # On a symmetric grid the second is the transpose of the first.
+        self.roles = [(R_res, R_mut)]
+        self.symmetric = mutual and np.array_equal(R_res.ravel(), R_mut.ravel())
+        if mutual and not self.symmetric:
+            self.roles.append((R_mut, R_res))
+
+        with np.errstate(divide='ignore'):
+            self.Ig = [(self.transform(Ig_m(R_r, R_m)), self.transform(Ig_r(R_r)))
+                       for R_r, R_m in self.roles]
+        self.c = None
+        self.Sb = None
+
+    def set_c(self, c):
+        if c != self.c:
+            with np.errstate(divide='ignore'):
+                self.Sb = [(self.transform(Sb_m(R_r, R_m, c)),
+                            self.transform(Sb_r(R_r, c)))
+                           for R_r, R_m in self.roles]
+            self.c = c
+
+    def __call__(self, alpha, c):
+        self.set_c(c)
+        result = None
+        for (Ig_mut, Ig_res), (Sb_mut, Sb_res) in zip(self.Ig, self.Sb):
+            invades = (self.combine(alpha, Ig_mut, Sb_mut) -
+                       self.combine(alpha, Ig_res, Sb_res)) > 0
+            if result is None:
+                result = invades.view(np.uint8)
+            else:
+                result = result + (result & invades)
+        if self.symmetric:
+            result = result + (result & result.T)
+        return result
+
+
+class ProgressiveInvasionMap(object):
+    """
+    Coarse-to-fine classification on square grids of levels[0], levels[1], ... points
+    between R_min and R_max. request(alpha, c) returns the coarsest level at once, from
+    an InvasionMapper, and starts refining through the finer levels on a background
+    thread, cancelling any refinement still running for an earlier request. poll()
+    hands over finished refinements.
+    """
+
+    def __init__(self, R_min, R_max, levels=(200, 2000), fitness_func='cd',
+                 mutual=True, n_workers=None, **kwargs):
+        self.edge_points = [np.linspace(R_min, R_max, n) for n in levels]
+        self.options = dict(kwargs, fitness_func=fitness_func, mutual=mutual,
+                            n_workers=n_workers)
+        self.coarse = InvasionMapper(self.edge_points[0], self.edge_points[0],
+                                     fitness_func, mutual, **kwargs)
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.cancel = threading.Event()
+        self.lock = threading.Lock()
+        self.finished = None
+
+    def request(self, alpha, c):
+        self.cancel.set()
+        self.cancel = threading.Event()
+        with self.lock:
+            self.finished = None
+
+        coarse = self.coarse(alpha, c)
+        if len(self.edge_points) > 1:
+            self.executor.submit(self._refine, alpha, c, self.cancel)
+        return coarse
+
+    def _refine(self, alpha, c, cancel):
+        for level, edge_points in enumerate(self.edge_points[1:], 1):
+            refined = tiled_invasion_map(edge_points, edge_points, alpha, c,
+                                         cancel=cancel, **self.options)
+            with self.lock:
+                if cancel.is_set():
+                    return
+                self.finished = (level, refined)
+
+    def poll(self):
+        """
+        The finest level finished since the last poll for the latest request, as
+        (level, classification), or None.
+        """
+        with self.lock:
+            finished, self.finished = self.finished, None
+        return finished
+
+    def close(self):
+        self.cancel.set()
+        self.executor.shutdown(wait=False)
+
+
+"""
+Tracing the boundaries of the invasion regions instead of evaluating the full grid.
+"""
+
+InvasionBoundary = collections.namedtuple(
+    'InvasionBoundary', ['res_points', 'edges', 'classes', 'n_evals'])
+
+
+def invasion_boundary(res_points, alpha, c, R_min, R_max,
+                      fitness_func='cd',
+                      mutual=True,
+                      n_samples=64,
+                      tol=1e-12,
+                      **kwargs):
+    """
+    Locate, for every resident reproduction number in res_points, the mutant
+    reproduction numbers between R_min and R_max at which the invasion classification
+    changes. The classification is sampled at n_samples mutant values on either side of
+    the diagonal and just off it. A change across the diagonal is placed on it, where
+    the fitness difference vanishes, and every other change is refined by vectorized
+    bisection to a bracket of width tol.
+
+    Returns an InvasionBoundary. Row j of edges holds R_min, the change points and
+    R_max, padded with R_max; row j of classes holds the classification of each
+    interval between consecutive edges, padded with -1. n_evals counts the evaluations
+    of invasion_fitness.
+    """
+    res_points = np.asarray(res_points, dtype=float)
+    R_res = res_points[:, None]
+
+    def classify(R_res, R_mut):
+        invades = (invasion_fitness(R_res, R_mut, alpha, c, fitness_func,
+                                    **kwargs) > 0).astype(np.uint8)
+        if mutual:
+            return invades + (invades & (invasion_fitness(
+                R_mut, R_res, alpha, c, fitness_func, **kwargs) > 0))
+        return invades
+
+    offsets = np.linspace(0., 1., n_samples, endpoint=False)
+    near = 1e-6 * (R_max - R_min)
+    nodes = np.concatenate([R_min + (R_res - R_min) * offsets,
+                            np.maximum(R_res - near, R_min),
+                            np.minimum(R_res + near, R_max),
+                            R_max - (R_max - R_res) * offsets[::-1]], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sampled = classify(R_res, nodes)
+    evals_per_class = 2 if mutual else 1
+    n_evals = sampled.size * evals_per_class
+
+    changes = sampled[:, 1:] != sampled[:, :-1]
+    rows, columns = np.nonzero(changes)
+    diagonal = columns == n_samples
+
+    lower = nodes[rows, columns]
+    upper = nodes[rows, columns + 1]
+    lower_class = sampled[rows, columns]
+    n_iter = int(np.ceil(np.log2(max(np.max(np.diff(nodes, axis=1)), tol) / tol)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for iteration in range(n_iter):
+            middle = 0.5 * (lower + upper)
+            same = classify(res_points[rows], middle) == lower_class
+            lower = np.where(same, middle, lower)
+            upper = np.where(same, upper, middle)
+    n_evals += n_iter * rows.size * evals_per_class
+    change_points = np.where(diagonal, res_points[rows], 0.5 * (lower + upper))
+
+    n_changes = changes.sum(axis=1)
+    slot = np.cumsum(changes, axis=1)[rows, columns]
+    edges = np.full((res_points.size, n_changes.max(initial=0) + 2), float(R_max))
+    edges[:, 0] = R_min
+    edges[rows, slot] = change_points
+    classes = np.full((res_points.size, edges.shape[1] - 1), -1, dtype=np.int8)
+    classes[:, 0] = sampled[:, 0]
+    classes[rows, slot] = sampled[rows, columns + 1]
+
+    return InvasionBoundary(res_points, edges, classes, n_evals)
+
+
+def _runs(boundary):
+    """
+    Slices of consecutive resident values sharing the same sequence of classes.
+    """
+    breaks = np.nonzero(np.any(boundary.classes[1:] != boundary.classes[:-1],
+                               axis=1))[0] + 1
+    bounds = np.concatenate([[0], breaks, [boundary.classes.shape[0]]])
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def boundary_polylines(boundary):
+    """
+    The boundaries between invasion classes as a list of (R_res, R_mut) polylines.
+    """
+    polylines = []
+    for run in _runs(boundary):
+        n_edges = np.sum(boundary.classes[run.start] >= 0) + 1
+        for k in range(1, n_edges - 1):
+            polylines.append((boundary.res_points[run], boundary.edges[run, k]))
+    return polylines
+
+
+def boundary_regions(boundary):
+    """
+    The invasion regions as a list of (R_res, lower R_mut, upper R_mut, class) tuples,
+    one for each band of constant class over a run of resident values.
+    """
+    regions = []
+    for run in _runs(boundary):
+        for k, region_class in enumerate(boundary.classes[run.start]):
+            if region_class >= 0:
+                regions.append((boundary.res_points[run],
+                                boundary.edges[run, k],
+                                boundary.edges[run, k + 1],
+                                region_class))
+    return regions
@@ -0,0 +1,97 @@
+"""
+Social optima of a monomorphic population, vectorized over alpha, c and rho.
+
+A population in which everyone has reproduction number R reaches the endemic equilibria
+Ig = 1 - 1/R and Sb = min(1, 1/(c R)), and the social optimum is the R that maximizes
+the utility of these equilibria. For the CES utility
+
+    U = (alpha Ig^rho + (1 - alpha) Sb^rho)^(1/rho)
+
+the first-order condition on cR > 1 factors as (R - 1)[alpha c^rho (R - 1)^(rho - 1) -
+(1 - alpha)] = 0, so its interior root is available in closed form,
+
+    R* = 1 + ((1 - alpha) / (alpha c^rho))^(1 / (rho - 1)),
+
+evaluated in log space. The optimum is the best of R*, the corner R = max(1, 1/c) where
+the bad contagion dies out, and R -> infinity. Choosing among these candidates by their
+utility reproduces the Cobb-Douglas optimum at rho = 0 and the linear one as rho -> 1
+without any branching on the parameters.
+"""
+
+import numpy as np
+
+from sociality.utility import log_utility
+
+
+def _result(value):
+    value = np.asarray(value, dtype=float)
+    return value[()] if value.ndim == 0 else value
+
+
+def monomorphic_log_utility(R, alpha, c, rho=0.):
+    """
+    Logarithm of the CES utility of a monomorphic population with reproduction number
+    R, vectorized over broadcast arguments. rho = 0 is the Cobb-Douglas utility and
+    rho = 1 the linear one.
+    """
+    R, c = np.asarray(R, dtype=float), np.asarray(c, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ig = np.maximum(0, 1 - 1 / R)
+        Sb = np.minimum(1, 1 / (c * R))
+    return log_utility(Ig, Sb, alpha, rho)
+
+
+def social_optimum_cd(alpha, c):
+    """
+    Cobb-Douglas utility social optimum
+    """
+    alpha, c = np.asarray(alpha, dtype=float), np.asarray(c, dtype=float)
+    with np.errstate(divide='ignore'):
+        return _result(np.where(alpha > 1 - c, 1 / (1 - alpha), 1 / c))
+
+
+def social_optimum_linear(alpha, c):
+    """
+    Linear utility social optimum
+    """
+    alpha, c = np.asarray(alpha, dtype=float), np.asarray(c, dtype=float)
+    with np.errstate(divide='ignore'):
+        return _result(np.where(alpha > 1 / (1 + c), np.inf, np.maximum(1, 1 / c)))
+
+
+def ces_stationary_point(alpha, c, rho):
+    """
+    Interior root R* of the CES first-order condition, which is 1 or infinity where the
+    root leaves the range of R.
+    """
+    alpha, c, rho = [np.asarray(x, dtype=float) for x in (alpha, c, rho)]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_excess = (np.log((1 - alpha) / alpha) - rho * np.log(c)) / (rho - 1)
+        log_excess = np.where(np.isnan(log_excess), -np.inf, log_excess)
+        return 1 + np.exp(log_excess)
+
+
+def social_optimum_ces(alpha, c, rho=1):
+    """
+    CES utility social optimum, vectorized over broadcast alpha, c and rho.
+    """
+    alpha, c, rho = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                          for x in (alpha, c, rho)])
+    with np.errstate(divide='ignore'):
+        corner = np.maximum(1, 1 / c)
+    candidates = np.stack([corner,
+                           np.maximum(ces_stationary_point(alpha, c, rho), corner),
+                           np.full(alpha.shape, np.inf)])
+
+    log_utility = monomorphic_log_utility(candidates, alpha, c, rho)
+    best = np.argmax(log_utility, axis=0)
+    return _result(np.take_along_axis(candidates, best[None], axis=0)[0])
+
+
+def social_optimum(alpha, c, fitness_func='cd', **kwargs):
+
+    funcs = {'linear': social_optimum_linear,
+             'cd': social_optimum_cd,
+             'ces': social_optimum_ces}
+
+    return funcs[fitness_func](alpha, c, **kwargs)
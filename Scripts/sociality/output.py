@@ -0,0 +1,91 @@
+"""
+Where the figure scripts write their figures.
+
+Figures go to the directory named by the SOCIALITY_FIGURE_DIR environment variable, or
+to the working directory by default. SOCIALITY_FIGURE_FORMATS may list file formats
+separated by commas (for instance "png,pdf"), in which case every figure is written
+once in each format; otherwise the format is that of the file name given.
+
+SOCIALITY_RENDER_PROFILE selects how text is typeset. The 'publication' profile (the
+default) keeps each script's LaTeX settings. The 'preview' profile renders text with
+matplotlib's own mathtext, which needs no TeX installation and caches its glyphs within
+a process, at a lower resolution, so that layout changes can be checked in seconds.
+"""
+
+import os
+
+
+RENDER_PROFILES = ('preview', 'publication')
+
+PREVIEW_DPI = 60
+
+PREVIEW_RC = {'text.usetex': False,
+              'mathtext.fontset': 'dejavusans',
+              'font.family': 'sans-serif',
+              'figure.dpi': PREVIEW_DPI,
+              'savefig.dpi': PREVIEW_DPI}
+
+
+"""
+Paths of the figures written by save_figure in this process, in order.
+"""
+written_figures = []
+
+
+def figure_directory():
+    """
+    The directory figures are written to, created if it does not exist.
+    """
+    directory = os.environ.get('SOCIALITY_FIGURE_DIR', os.getcwd())
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def figure_formats(filename):
+    """
+    The formats in which the figure filename is written.
+    """
+    formats = os.environ.get('SOCIALITY_FIGURE_FORMATS', '')
+    formats = [f.strip().lstrip('.') for f in formats.split(',') if f.strip()]
+    if not formats:
+        formats = [os.path.splitext(filename)[1].lstrip('.') or 'png']
+    return formats
+
+
+def save_figure(figure, filename, **kwargs):
+    """
+    Save the matplotlib figure under filename in the figure directory, once for each
+    configured format, passing kwargs to figure.savefig. Returns the paths written.
+    """
+    stem = os.path.join(figure_directory(), os.path.splitext(filename)[0])
+    paths = []
+    for extension in figure_formats(filename):
+        path = stem + '.' + extension
+        figure.savefig(path, **kwargs)
+        paths.append(path)
+    written_figures.extend(paths)
+    return paths
+
+
+def render_profile():
+    """
+    The render profile selected by SOCIALITY_RENDER_PROFILE.
+    """
+    profile = os.environ.get('SOCIALITY_RENDER_PROFILE', 'publication')
+    if profile not in RENDER_PROFILES:
+        raise ValueError("Unknown render profile '{}', expected one of {}".format(
+            profile, RENDER_PROFILES))
+    return profile
+
+
+def render_rc(publication, profile=None):
+    """
+    matplotlib rcParams for a script whose publication settings are publication, under
+    profile (by default the one selected by SOCIALITY_RENDER_PROFILE).
+    """
+    if profile is None:
+        profile = render_profile()
+    elif profile not in RENDER_PROFILES:
+        raise ValueError("Unknown render profile '{}', expected one of {}".format(
+            profile, RENDER_PROFILES))
+    return dict(publication if profile == 'publication' else PREVIEW_RC)
@@ -0,0 +1,237 @@
+"""
+A small scheduler for the compute and render stages of the figures.
+
+The stages form a directed acyclic graph of nodes. A node is a module-level function
+called with keyword parameters, and runs once all the nodes it depends on have run;
+independent nodes run concurrently in worker processes, from a pool that stays up for
+later runs in the same process. Nodes do not pass results to each other directly: a
+compute node fills the array cache of sociality.cache, and the render nodes that depend
+on it read its results from there. The keys of that cache cover the same code as the
+hashes below, so that a node rerun after a change does not read stale results.
+
+A node running in the pool has a worker budget of one (see sociality.workers) and
+computes serially; a node running in this process has the whole budget of n_workers.
+
+Every node is identified by a hash of its parameters, of its code (the source of its
+function and of the files it reads, by default the function's module, together with
+the modules of this package imported from them, directly or not) and of the hashes of
+its dependencies. The hashes of the nodes that ran, and the files they wrote, are kept
+in a JSON state file, and a node whose hash is unchanged and whose files all exist is
+skipped. A change to a script or to a module of the package therefore reruns exactly
+the nodes that depend on it.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+
+from sociality.cache import cache_key
+from sociality.sources import file_digest, source_files
+from sociality.workers import set_worker_budget, shared_executor, worker_budget
+
+
+Node = collections.namedtuple('Node', ['func', 'params', 'deps', 'code', 'sources',
+                                       'writes_files'])
+
+NodeResult = collections.namedtuple('NodeResult', ['name', 'status', 'seconds', 'error'])
+
+
+def _execute(func, params, writes_files, n_workers=None):
+    """
+    Run a node, with a worker budget of n_workers if given. Returns the time taken and
+    the files written.
+    """
+    start = time.time()
+    if n_workers is None:
+        result = func(**params)
+    else:
+        previous = set_worker_budget(n_workers)
+        try:
+            result = func(**params)
+        finally:
+            set_worker_budget(previous)
+    return time.time() - start, sorted(result) if writes_files else []
+
+
+class Pipeline(object):
+    """
+    A graph of compute and render nodes whose state is kept in the JSON file
+    state_path (no state, so that every node runs, if state_path is None).
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.nodes = collections.OrderedDict()
+
+    def add(self, name, func, params=None, deps=(), sources=(), writes_files=False):
+        """
+        Add the node name, which calls func(**params) after the nodes deps have run.
+        The code of the node is the source of func and the files sources (by default
+        the module of func), with the modules of this package they import. With
+        writes_files=True func returns the paths of the files it wrote, and the node
+        reruns if any of them is missing.
+        Nodes are added after their dependencies, so that the graph has no cycles.
+        Returns name.
+        """
+        if name in self.nodes:
+            raise ValueError("Node '{}' already exists".format(name))
+        unknown = [dep for dep in deps if dep not in self.nodes]
+        if unknown:
+            raise ValueError("Node '{}' depends on unknown nodes {}".format(name, unknown))
+
+        func_source = inspect.unwrap(func)
+        code = hashlib.sha256(inspect.getsource(func_source).encode('utf-8')).hexdigest()
+        sources = list(sources) or [inspect.getsourcefile(func_source)]
+        files = sorted(set(path for source in sources for path in source_files(source)))
+        self.nodes[name] = Node(func, dict(params or {}), tuple(deps), code, files,
+                                writes_files)
+        return name
+
+    def required(self, targets=None):
+        """
+        The nodes needed for targets (all nodes by default), in an order in which each
+        comes after its dependencies.
+        """
+        if targets is None:
+            return list(self.nodes)
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.nodes:
+                raise ValueError("Unknown node '{}'".format(name))
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.nodes[name].deps)
+        return [name for name in self.nodes if name in needed]
+
+    def hashes(self, names=None):
+        """
+        The hashes of the nodes names (all nodes by default), as a dict.
+        """
+        names = self.required(names)
+        digests = {}
+        hashes = {}
+        for name in names:
+            node = self.nodes[name]
+            for path in node.sources:
+                if path not in digests:
+                    digests[path] = file_digest(path)
+            hashes[name] = cache_key(name,
+                                     code=[node.code] + [digests[path]
+                                                         for path in node.sources],
+                                     params=node.params,
+                                     deps=[hashes[dep] for dep in node.deps])
+        return hashes
+
+    def _load_state(self):
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as state_file:
+                return json.load(state_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        if self.state_path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as temp_file:
+            json.dump(state, temp_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+    def outdated(self, targets=None):
+        """
+        The nodes needed for targets that would run, in order.
+        """
+        names = self.required(targets)
+        hashes = self.hashes(names)
+        state = self._load_state()
+        return [name for name in names if not self._up_to_date(state, name, hashes[name])]
+
+    @staticmethod
+    def _up_to_date(state, name, node_hash):
+        entry = state.get(name)
+        return (entry is not None and entry['hash'] == node_hash
+                and all(os.path.exists(path) for path in entry['outputs']))
+
+    def run(self, targets=None, n_workers=None, force=False):
+        """
+        Run the nodes needed for targets (all nodes by default) that are out of date,
+        or all of them if force is True, in the shared pool of n_workers processes (by
+        default the worker budget) of sociality.workers. A node whose dependency failed
+        does not run. Returns a NodeResult for every node, with status 'built',
+        'skipped', 'failed' or 'blocked', in the order in which they finished.
+        """
+        names = self.required(targets)
+        hashes = self.hashes(names)
+        state = self._load_state()
+        if n_workers is None:
+            n_workers = worker_budget()
+
+        results = []
+        done = set()
+        failed = set()
+
+        def finish(name, outcome, error=None):
+            if error is not None:
+                failed.add(name)
+                results.append(NodeResult(name, 'failed', 0., error))
+                return
+            seconds, outputs = outcome
+            done.add(name)
+            state[name] = {'hash': hashes[name], 'outputs': outputs}
+            self._save_state(state)
+            results.append(NodeResult(name, 'built', seconds, None))
+
+        executor = None
+        if n_workers > 1 and len(names) > 1:
+            executor = shared_executor(n_workers)
+
+        pending = list(names)
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                node = self.nodes[name]
+                if any(dep in failed for dep in node.deps):
+                    pending.remove(name)
+                    failed.add(name)
+                    results.append(NodeResult(name, 'blocked', 0., None))
+                elif all(dep in done for dep in node.deps):
+                    pending.remove(name)
+                    if not force and self._up_to_date(state, name, hashes[name]):
+                        done.add(name)
+                        results.append(NodeResult(name, 'skipped', 0., None))
+                    elif executor is None:
+                        try:
+                            outcome = _execute(node.func, node.params, node.writes_files,
+                                               n_workers)
+                        except Exception as error:
+                            finish(name, None, error)
+                        else:
+                            finish(name, outcome)
+                    else:
+                        future = executor.submit(_execute, node.func, node.params,
+                                                 node.writes_files)
+                        running[future] = name
+
+            if running:
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as error:
+                        finish(name, None, error)
+                    else:
+                        finish(name, outcome)
+
+        return results
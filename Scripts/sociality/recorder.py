@@ -0,0 +1,124 @@
+"""
+Bounded-memory recording of trajectories of the contagion dynamics.
+
+A TrajectoryRecorder is passed as the callback of contagion.integrate (or of
+replicator.simulate) and keeps a fixed number of (t, Im, Ir) states for the whole batch,
+however long the run. The states are held in a single preallocated array, which may be
+a memory-mapped .npy file on disk.
+"""
+
+import numpy as np
+
+
+class TrajectoryRecorder(object):
+    """
+    Records the states passed to it as callback(t, Im, Ir), or more generally as
+    callback(t, *fields). The mode sets which states are kept:
+
+    'endpoints': only the first and the most recent state.
+    'decimate':  every k-th state, starting with k = every. When the capacity is
+                 reached every other stored state is dropped and k is doubled, so
+                 the stored states always span the whole run.
+    'ring':      the most recent capacity states, in a circular buffer.
+
+    If filename is given, the states are stored in a memory-mapped .npy file of shape
+    (capacity, n_fields) + batch shape, with t, Im and Ir (or t and the other fields)
+    along the second axis. Only the first n_stored rows (in circular order for 'ring')
+    hold recorded states.
+    """
+
+    def __init__(self, mode='decimate', every=1, capacity=10000, filename=None):
+        if mode not in ('endpoints', 'decimate', 'ring'):
+            raise ValueError("Unknown recording mode '{}'".format(mode))
+        if mode == 'endpoints':
+            capacity = 2
+
+        self.mode = mode
+        self.every = every
+        self.capacity = capacity
+        self.filename = filename
+
+        self.data = None
+        self.n_stored = 0
+        self.n_calls = 0
+        self.last = None
+        self.last_stored = -1
+
+    def _allocate(self, state_shape):
+        shape = (self.capacity,) + state_shape
+        if self.filename is None:
+            self.data = np.empty(shape)
+        else:
+            self.data = np.lib.format.open_memmap(self.filename, mode='w+',
+                                                  dtype=float, shape=shape)
+
+    def _store(self, state):
+        if self.mode == 'ring':
+            self.data[self.n_stored % self.capacity] = state
+        else:
+            if self.n_stored == self.capacity:
+                kept = self.data[::2].copy()
+                self.data[:kept.shape[0]] = kept
+                self.n_stored = kept.shape[0]
+                self.every *= 2
+                if self.n_calls % self.every != 0:
+                    return
+            self.data[self.n_stored] = state
+        self.n_stored += 1
+        self.last_stored = self.n_calls
+
+    def __call__(self, *fields):
+        state = np.stack(np.broadcast_arrays(*fields))
+        if self.data is None:
+            self._allocate(state.shape)
+
+        if self.mode == 'endpoints':
+            if self.n_calls == 0:
+                self.data[0] = state
+                self.n_stored = 1
+                self.last_stored = 0
+        elif self.n_calls % self.every == 0:
+            self._store(state)
+
+        self.last = state
+        self.n_calls += 1
+
+    def states(self):
+        """
+        The stored states in chronological order, always ending with the most recent
+        state, as an array of shape (n, n_fields) + batch shape.
+        """
+        if self.data is None:
+            return np.empty((0, 3))
+
+        if self.mode == 'ring' and self.n_stored > self.capacity:
+            start = self.n_stored % self.capacity
+            stored = np.concatenate([self.data[start:], self.data[:start]])
+        else:
+            stored = self.data[:min(self.n_stored, self.capacity)]
+
+        if self.last_stored != self.n_calls - 1:
+            stored = np.concatenate([stored, self.last[np.newaxis]])
+        return stored
+
+    def field(self, index):
+        return self.states()[:, index]
+
+    @property
+    def t(self):
+        return self.states()[:, 0]
+
+    @property
+    def Im(self):
+        return self.states()[:, 1]
+
+    @property
+    def Ir(self):
+        return self.states()[:, 2]
+
+    def flush(self):
+        """
+        Write any memory-mapped states to disk.
+        """
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
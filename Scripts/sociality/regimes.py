@@ -0,0 +1,128 @@
+"""
+Qualitative regimes of the evolutionarily-stable and socially-optimal sociality over
+(alpha, c), for any utility.
+
+At every point R_ESS and R_opt are classified as lying at the corner max(1, 1/c), where
+the bad contagion dies out (or, for c > 1, the good one), in the interior, or at
+infinity, and R_ESS is compared with R_opt. The three features combine into an integer
+regime code, so that the region maps of Figures 3b and 8 are images of these codes and
+the boundaries between regions come from the map rather than from thresholds derived
+by hand for each utility.
+
+A utility is a plug-in: a pair of vectorized functions (alpha, c, **kwargs) -> R_ESS
+and R_opt, registered under the name used by sociality.invasion.fitness.
+"""
+
+import collections
+
+import numpy as np
+
+from sociality.dilemma import ess_cd, ess_linear, ess_ces
+from sociality.optimum import (social_optimum_cd, social_optimum_linear,
+                               social_optimum_ces)
+
+
+"""
+Position of R_ESS or R_opt.
+"""
+CORNER = 0
+INTERIOR = 1
+INFINITE = 2
+
+"""
+R_ESS relative to R_opt.
+"""
+BELOW = 0
+EQUAL = 1
+ABOVE = 2
+
+UTILITIES = {'cd': (ess_cd, social_optimum_cd),
+             'linear': (ess_linear, social_optimum_linear),
+             'ces': (ess_ces, social_optimum_ces)}
+
+RegimeMap = collections.namedtuple('RegimeMap', ['regime', 'R_ESS', 'R_opt'])
+
+
+def register_utility(name, ess, optimum):
+    """
+    Make a utility available to regime_map under name. ess and optimum map broadcast
+    (alpha, c) and any keyword parameters of the utility to R_ESS and R_opt.
+    """
+    UTILITIES[name] = (ess, optimum)
+
+
+def regime_code(ess, optimum, order):
+    """
+    Code of the regime in which R_ESS and R_opt are at positions ess and optimum
+    (CORNER, INTERIOR or INFINITE) and R_ESS is order (BELOW, EQUAL or ABOVE) R_opt.
+    """
+    return 9 * ess + 3 * optimum + order
+
+
+def regime_features(code):
+    """
+    The (ess, optimum, order) features of a regime code.
+    """
+    return code // 9, (code // 3) % 3, code % 3
+
+
+def regime_description(code):
+    """
+    Plain-text description of a regime, such as 'R_ESS > R_opt = corner'.
+    """
+    ess, optimum, order = regime_features(code)
+    positions = ('corner', 'interior', 'infinite')
+    relations = ('<', '=', '>')
+    return 'R_ESS {} R_opt; R_ESS {}, R_opt {}'.format(
+        relations[order], positions[ess], positions[optimum])
+
+
+def position(R, c, rtol=1e-9):
+    """
+    CORNER, INTERIOR or INFINITE for sociality R at relative infectiousness c.
+    """
+    with np.errstate(divide='ignore'):
+        corner = np.maximum(1., 1. / np.asarray(c, dtype=float))
+    return np.where(np.isinf(R), INFINITE,
+                    np.where(np.isclose(R, corner, rtol=rtol, atol=0.),
+                             CORNER, INTERIOR))
+
+
+def classify(R_ESS, R_opt, c, rtol=1e-9):
+    """
+    Regime codes for broadcast R_ESS, R_opt and c. Values within relative tolerance
+    rtol of each other count as equal.
+    """
+    with np.errstate(invalid='ignore'):
+        equal = (R_ESS == R_opt) | np.isclose(R_ESS, R_opt, rtol=rtol, atol=0.)
+        order = np.where(equal, EQUAL, np.where(R_ESS > R_opt, ABOVE, BELOW))
+    return regime_code(position(R_ESS, c, rtol), position(R_opt, c, rtol), order)
+
+
+def regime_map(alpha, c, utility='cd', rtol=1e-9, chunk_size=2 ** 20, **kwargs):
+    """
+    Regime codes, R_ESS and R_opt at broadcast (alpha, c) for the named utility, with
+    any parameters of the utility (rho for 'ces') as keyword arguments. The points are
+    processed chunk_size at a time. Returns a RegimeMap of arrays with the broadcast
+    shape; the codes are int8.
+    """
+    try:
+        ess, optimum = UTILITIES[utility]
+    except KeyError:
+        raise ValueError("Unknown utility '{}'".format(utility))
+
+    alpha, c = np.broadcast_arrays(np.asarray(alpha, dtype=float),
+                                   np.asarray(c, dtype=float))
+    shape = alpha.shape
+    alpha, c = alpha.ravel(), c.ravel()
+
+    regime = np.empty(alpha.size, dtype=np.int8)
+    R_ESS = np.empty(alpha.size)
+    R_opt = np.empty(alpha.size)
+    for start in range(0, alpha.size, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        R_ESS[chunk] = ess(alpha[chunk], c[chunk], **kwargs)
+        R_opt[chunk] = optimum(alpha[chunk], c[chunk], **kwargs)
+        regime[chunk] = classify(R_ESS[chunk], R_opt[chunk], c[chunk], rtol)
+
+    return RegimeMap(regime.reshape(shape), R_ESS.reshape(shape), R_opt.reshape(shape))
@@ -0,0 +1,189 @@
+"""
+Eco-evolutionary dynamics coupling the mutant fraction $f$ to the contagion state.
+
+The fraction of mutant strategists evolves under the replicator equation
+
+    df/dt = epsilon * f (1 - f) (U_m - U_r),
+
+with Cobb-Douglas utilities U = (I^g)^alpha (S^b)^(1 - alpha) evaluated at the current
+(not the equilibrium) levels of the good and bad contagion, which in turn follow the
+two-type contagion dynamics of sociality.contagion. A small epsilon makes the contagion
+dynamics fast relative to selection, so the full five-dimensional system is integrated
+with the L-stable Rosenbrock method ROS2 and an analytic Jacobian. Any number of initial
+fractions and parameter sets are advanced together, each with its own step size.
+"""
+
+import collections
+
+import numpy as np
+
+from sociality.contagion import (Im_righthand, Ir_righthand, contagion_jacobian,
+                                 contagion_f_derivative, ROS2_GAMMA)
+
+
+"""
+Labels for the long-time outcome of the replicator dynamics.
+"""
+RESIDENT = 0
+COEXISTENCE = 1
+MUTANT = 2
+
+ReplicatorSolution = collections.namedtuple(
+    'ReplicatorSolution',
+    ['f', 'Img', 'Irg', 'Imb', 'Irb', 't', 'n_steps', 'n_evals', 'converged'])
+
+
+def utility(alpha, Ig, Ib):
+    return (Ig ** alpha) * ((1.0 - Ib) ** (1.0 - alpha))
+
+
+def replicator_righthand(y, Rm, Rr, c, alpha, epsilon):
+    """
+    Right-hand side of the coupled system for states y = (f, Img, Irg, Imb, Irb) stacked
+    along the last axis.
+    """
+    f, Img, Irg, Imb, Irb = np.moveaxis(y, -1, 0)
+    selection = utility(alpha, Img, Imb) - utility(alpha, Irg, Irb)
+    return np.stack([epsilon * f * (1 - f) * selection,
+                     Im_righthand(Rm, Rr, f, Img, Irg),
+                     Ir_righthand(Rm, Rr, f, Img, Irg),
+                     Im_righthand(c * Rm, c * Rr, f, Imb, Irb),
+                     Ir_righthand(c * Rm, c * Rr, f, Imb, Irb)], axis=-1)
+
+
+def replicator_jacobian(y, Rm, Rr, c, alpha, epsilon):
+    """
+    Analytic Jacobian of replicator_righthand, with shape y.shape + (5,).
+    """
+    f, Img, Irg, Imb, Irb = np.moveaxis(y, -1, 0)
+    J = np.zeros(y.shape + (5,))
+
+    Um = utility(alpha, Img, Imb)
+    Ur = utility(alpha, Irg, Irb)
+    rate = epsilon * f * (1 - f)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        J[..., 0, 0] = epsilon * (1 - 2 * f) * (Um - Ur)
+        J[..., 0, 1] = np.where(Img > 0, rate * alpha * Um / Img, 0.)
+        J[..., 0, 2] = np.where(Irg > 0, -rate * alpha * Ur / Irg, 0.)
+        J[..., 0, 3] = np.where(Imb < 1, -rate * (1 - alpha) * Um / (1 - Imb), 0.)
+        J[..., 0, 4] = np.where(Irb < 1, rate * (1 - alpha) * Ur / (1 - Irb), 0.)
+
+    for first, scale, Im, Ir in [(1, 1., Img, Irg), (3, c, Imb, Irb)]:
+        J11, J12, J21, J22 = contagion_jacobian(scale * Rm, scale * Rr, f, Im, Ir)
+        dIm_df, dIr_df = contagion_f_derivative(scale * Rm, scale * Rr, f, Im, Ir)
+        J[..., first, 0] = dIm_df
+        J[..., first + 1, 0] = dIr_df
+        J[..., first, first] = J11
+        J[..., first, first + 1] = J12
+        J[..., first + 1, first] = J21
+        J[..., first + 1, first + 1] = J22
+
+    return J
+
+
+def _ros2_step(y, h, params, rtol, atol):
+    """
+    Batched ROS2 step for states y of shape (N, 5), with the embedded first-order
+    solution used for local error control. The stage and the new state are clipped to
+    [0, 1], where all five variables live. Rejected steps leave y unchanged.
+    """
+    M = np.eye(5) - ROS2_GAMMA * h[:, None, None] * replicator_jacobian(y, **params)
+
+    F1 = replicator_righthand(y, **params)
+    k1 = np.linalg.solve(M, F1[..., None])[..., 0]
+    stage = np.clip(y + h[:, None] * k1, 0., 1.)
+    F2 = replicator_righthand(stage, **params) - 2.0 * k1
+    k2 = np.linalg.solve(M, F2[..., None])[..., 0]
+
+    y_new = np.clip(y + h[:, None] * (1.5 * k1 + 0.5 * k2), 0., 1.)
+    scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+    error = np.max(np.abs(0.5 * h[:, None] * (k1 + k2)) / scale, axis=-1)
+
+    accepted = error <= 1.
+    factor = np.clip(0.9 * np.where(error > 0, error, 1e-10) ** -0.5, 0.2, 5.)
+    y_new = np.where(accepted[:, None], y_new, y)
+
+    return y_new, h * factor, accepted, np.abs(F1).sum(axis=-1)
+
+
+def simulate(f0, Rm, Rr, c, alpha,
+             epsilon=1.,
+             Ig0=0.5,
+             Ib0=0.5,
+             t_max=1e5,
+             time_step=0.1,
+             residual_tol=1e-10,
+             rtol=1e-4,
+             atol=1e-7,
+             max_steps=100000,
+             callback=None):
+    """
+    Integrate the coupled replicator and contagion dynamics from initial mutant
+    fractions f0, with the good and bad contagion starting at Ig0 and Ib0 in both
+    strategies. All arguments up to epsilon broadcast against each other. Each system
+    stops at t_max, or once the summed absolute right-hand side falls below
+    residual_tol. If given, callback(t, f, Img, Irg, Imb, Irb) is called at the start
+    and after every step. Returns a ReplicatorSolution whose fields all have the
+    broadcast shape.
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                   (f0, Rm, Rr, c, alpha, epsilon, Ig0, Ib0)])
+    shape = arrays[0].shape
+    f0, Rm, Rr, c, alpha, epsilon, Ig0, Ib0 = [x.ravel() for x in arrays]
+    params = {'Rm': Rm, 'Rr': Rr, 'c': c, 'alpha': alpha, 'epsilon': epsilon}
+
+    y = np.stack([f0, Ig0, Ig0, Ib0, Ib0], axis=-1)
+    t = np.zeros(f0.size)
+    h = np.full(f0.size, float(time_step))
+    n_steps = np.zeros(f0.size, dtype=int)
+    n_evals = np.zeros(f0.size, dtype=int)
+    active = np.arange(f0.size)
+
+    def report():
+        if callback is not None:
+            callback(t.reshape(shape), *[y[:, i].reshape(shape) for i in range(5)])
+
+    report()
+    for step in range(max_steps):
+        if active.size == 0:
+            break
+        a = active
+        h[a] = np.minimum(h[a], t_max - t[a])
+
+        y_new, h_next, accepted, residual = _ros2_step(
+            y[a], h[a], {k: v[a] for k, v in params.items()}, rtol, atol)
+        t[a] += np.where(accepted, h[a], 0.)
+        y[a] = y_new
+        h[a] = h_next
+        n_steps[a] += accepted
+        n_evals[a] += 2
+
+        report()
+        finished = (residual < residual_tol) | (t[a] >= t_max * (1 - 1e-12))
+        active = a[~finished]
+
+    converged = np.abs(replicator_righthand(y, **params)).sum(axis=-1) < residual_tol
+    n_evals += 1
+
+    fields = [y[:, i] for i in range(5)] + [t, n_steps, n_evals, converged]
+    return ReplicatorSolution(*[x.reshape(shape) for x in fields])
+
+
+def classify(f_final, f_tol=1e-6):
+    """
+    Label final mutant fractions as RESIDENT (f = 0), MUTANT (f = 1) or COEXISTENCE.
+    """
+    return np.where(f_final < f_tol, RESIDENT,
+                    np.where(f_final > 1 - f_tol, MUTANT, COEXISTENCE))
+
+
+def basins(f0, Rm, Rr, c, alpha, f_tol=1e-6, **kwargs):
+    """
+    Final mutant fractions and their outcome labels for every combination of initial
+    fraction and parameters. f0 is a 1-D array of initial fractions, which is placed
+    along a new last axis after the broadcast shape of the parameters.
+    """
+    Rm, Rr, c, alpha = [np.asarray(x, dtype=float)[..., None]
+                        for x in np.broadcast_arrays(Rm, Rr, c, alpha)]
+    solution = simulate(np.asarray(f0, dtype=float), Rm, Rr, c, alpha, **kwargs)
+    return solution.f, classify(solution.f, f_tol)
@@ -0,0 +1,74 @@
+"""
+The source files that a piece of code depends on, and hashes of them.
+
+The modules of this package that a file imports are found by reading its import
+statements, including those inside functions, and following them through the package.
+A hash of all these files changes with any change to code the file may run, which
+sociality.cache and sociality.pipeline use to tell stale results from current ones.
+"""
+
+import ast
+import hashlib
+import os
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _imported_files(path):
+    """
+    Source files of the modules of this package imported by the file path.
+    """
+    with open(path) as source_file:
+        tree = ast.parse(source_file.read(), path)
+
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+            modules.extend(node.module + '.' + alias.name for alias in node.names)
+
+    files = []
+    for module in modules:
+        parts = module.split('.')
+        if parts[0] != 'sociality':
+            continue
+        candidate = os.path.join(PACKAGE_DIR, *parts[1:]) + '.py' if parts[1:] else \
+            os.path.join(PACKAGE_DIR, '__init__.py')
+        if os.path.exists(candidate):
+            files.append(candidate)
+    return files
+
+
+def source_files(path):
+    """
+    The file path and the source files of the modules of this package it imports,
+    directly or through other modules of the package, sorted.
+    """
+    seen = set()
+    stack = [os.path.abspath(path)]
+    while stack:
+        path = stack.pop()
+        if path not in seen:
+            seen.add(path)
+            stack.extend(_imported_files(path))
+    return sorted(seen)
+
+
+def file_digest(path):
+    """
+    Hash of the content of the file path.
+    """
+    with open(path, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def code_digest(path):
+    """
+    Hash of the file path and of the modules of this package it imports, directly or
+    not.
+    """
+    digests = [file_digest(source) for source in source_files(path)]
+    return hashlib.sha256(''.join(digests).encode('utf-8')).hexdigest()
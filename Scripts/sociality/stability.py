@@ -0,0 +1,78 @@
+"""
+Stability region of the endemic equilibrium of the two-type contagion over (Rm, Rr).
+
+The endemic equilibrium exists and is stable where $R_{net} \geq 1$, which for a mutant
+fraction f is the outside of the ellipse
+
+    Locus(Rm, Rr, f) = 4 f (Rm - 1/2)^2 + 4 (1 - f) (Rr - 1/2)^2 = 1
+
+centred at (1/2, 1/2) with semi-axes 1/(2 sqrt(f)) along Rm and 1/(2 sqrt(1 - f))
+along Rr. stability_masks evaluates the region on a grid for many f at once, using
+that Locus is a weighted sum of a function of Rm and a function of Rr, and can pack the
+masks into bits. stability_boundary gives the boundary curve itself, with no grid.
+"""
+
+import numpy as np
+
+
+def locus(Rm, Rr, f):
+    """
+    Left-hand side of the equation Locus = 1 of the stability boundary.
+    """
+    first_term = 4. * f * ((Rm - 0.5) ** 2)
+    second_term = 4. * (1. - f) * ((Rr - 0.5) ** 2)
+    return first_term + second_term
+
+
+def stability_masks(Rm_points, Rr_points, f_values, packed=False, chunk_size=None):
+    """
+    Masks of Locus(Rm, Rr, f) >= 1 on the grid Rm_points x Rr_points for every f in
+    f_values, as a bool array of shape (n_f, n_Rm, n_Rr). With packed=True the masks
+    are bit-packed along the Rr axis into a uint8 array of shape
+    (n_f, n_Rm, ceil(n_Rr / 8)); unpack_masks restores them. The f values are
+    processed chunk_size at a time, by default as many as fit in 2^24 grid points.
+    """
+    Rm_term = 4. * (np.asarray(Rm_points, dtype=float).ravel() - 0.5) ** 2
+    Rr_term = 4. * (np.asarray(Rr_points, dtype=float).ravel() - 0.5) ** 2
+    f_values = np.asarray(f_values, dtype=float).ravel()
+    n_Rm, n_Rr = Rm_term.size, Rr_term.size
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 24 // max(1, n_Rm * n_Rr))
+
+    if packed:
+        masks = np.empty((f_values.size, n_Rm, (n_Rr + 7) // 8), dtype=np.uint8)
+    else:
+        masks = np.empty((f_values.size, n_Rm, n_Rr), dtype=bool)
+
+    for start in range(0, f_values.size, chunk_size):
+        f = f_values[start:start + chunk_size, None, None]
+        chunk = f * Rm_term[None, :, None] + (1. - f) * Rr_term[None, None, :] >= 1.
+        masks[start:start + chunk_size] = np.packbits(chunk, axis=-1) if packed else chunk
+
+    return masks
+
+
+def unpack_masks(packed, n_Rr):
+    """
+    The bool masks of bit-packed ones.
+    """
+    return np.unpackbits(packed, axis=-1, count=n_Rr).astype(bool)
+
+
+def stability_boundary(f, n_points=721, R_range=(0., 2.)):
+    """
+    The curve Locus(Rm, Rr, f) = 1 for non-negative Rm and Rr, as a list of (Rm, Rr)
+    polylines. For 0 < f < 1 this is the closed ellipse sampled at n_points equally
+    spaced angles. For f = 0 it is the line Rr = 1 and for f = 1 the line Rm = 1, drawn
+    across R_range; their mirror images Rr = 0 and Rm = 0 bound no positive rates.
+    """
+    f = float(f)
+    if f <= 0.:
+        return [(np.array(R_range, dtype=float), np.ones(2))]
+    if f >= 1.:
+        return [(np.ones(2), np.array(R_range, dtype=float))]
+
+    angle = np.linspace(0., 2. * np.pi, n_points)
+    Rm = 0.5 + np.cos(angle) / (2. * np.sqrt(f))
+    Rr = 0.5 + np.sin(angle) / (2. * np.sqrt(1. - f))
+    return [(Rm, Rr)]
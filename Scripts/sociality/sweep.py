@@ -0,0 +1,112 @@
+"""
+Parameter sweeps of the two-type model over (Rr, Rm, c, alpha).
+
+For every parameter point the long-time contagion state is computed on a grid of mutant
+fractions $f$, and the sign of the utility difference U_m - U_r along that grid decides
+the outcome of the replicator dynamics. The points are split into chunks that are
+processed in parallel in the shared pool of sociality.workers, and the results are collected into a single
+structured array.
+"""
+
+import itertools
+
+import numpy as np
+
+from sociality.equilibrium import equilibrium_sweep
+from sociality.replicator import utility
+from sociality.workers import shared_executor, worker_budget
+
+
+"""
+Outcomes of the replicator dynamics between the mutant and resident strategy.
+"""
+MUTANT_DOMINATES = 0
+RESIDENT_DOMINATES = 1
+COEXISTENCE = 2
+BISTABLE = 3
+NEUTRAL = 4
+
+OUTCOME_NAMES = ('mutant dominates', 'resident dominates', 'coexistence', 'bistable',
+                 'neutral')
+
+SWEEP_DTYPE = np.dtype([('Rr', float),
+                        ('Rm', float),
+                        ('c', float),
+                        ('alpha', float),
+                        ('outcome', np.int8),
+                        ('n_crossings', int),
+                        ('f_crossing', float),
+                        ('Ur_resident', float),
+                        ('Um_mutant', float)])
+
+
+def parameter_grid(Rr, Rm, c, alpha):
+    """
+    All combinations of the given values, as an array of (Rr, Rm, c, alpha) rows.
+    """
+    return np.array(list(itertools.product(*[np.atleast_1d(x) for x in
+                                             (Rr, Rm, c, alpha)])), dtype=float)
+
+
+def classify_points(points, f_grid, utility_tol=1e-12):
+    """
+    Evaluate one chunk of (Rr, Rm, c, alpha) rows on the mutant fraction grid f_grid and
+    return the corresponding rows of the structured result.
+    """
+    Rr, Rm, c, alpha = [points[:, i, None] for i in range(4)]
+    Img, Irg, Imb, Irb = equilibrium_sweep(Rm, Rr, c, f_grid[None, :])
+    Um = utility(alpha, Img, Imb)
+    Ur = utility(alpha, Irg, Irb)
+
+    difference = Um - Ur
+    sign = np.where(np.abs(difference) <= utility_tol, 0, np.sign(difference))
+    start, end = sign[:, 0], sign[:, -1]
+    n_crossings = np.sum(sign[:, 1:] * sign[:, :-1] < 0, axis=1)
+
+    outcome = np.full(points.shape[0], NEUTRAL, dtype=np.int8)
+    outcome[(start >= 0) & (end > 0) | (start > 0) & (end >= 0)] = MUTANT_DOMINATES
+    outcome[(start <= 0) & (end < 0) | (start < 0) & (end <= 0)] = RESIDENT_DOMINATES
+    outcome[(start > 0) & (end < 0)] = COEXISTENCE
+    outcome[(start < 0) & (end > 0)] = BISTABLE
+
+    first = np.argmax(sign[:, 1:] * sign[:, :-1] < 0, axis=1)
+    rows = np.arange(points.shape[0])
+    d0, d1 = difference[rows, first], difference[rows, first + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_crossing = (f_grid[first] -
+                      d0 * (f_grid[first + 1] - f_grid[first]) / (d1 - d0))
+
+    result = np.empty(points.shape[0], dtype=SWEEP_DTYPE)
+    result['Rr'], result['Rm'], result['c'], result['alpha'] = points.T
+    result['outcome'] = outcome
+    result['n_crossings'] = n_crossings
+    result['f_crossing'] = np.where(n_crossings == 1, f_crossing, np.nan)
+    result['Ur_resident'] = Ur[:, 0]
+    result['Um_mutant'] = Um[:, -1]
+    return result
+
+
+def sweep(points, f_grid=None, n_workers=None, chunk_size=2000):
+    """
+    Classify the replicator dynamics at every (Rr, Rm, c, alpha) row of points, in
+    chunks of chunk_size points, using the shared pool of n_workers processes (by
+    default the worker budget) of sociality.workers, or serially for one worker.
+    Returns a structured array with dtype SWEEP_DTYPE, in the order of points.
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    if f_grid is None:
+        f_grid = np.linspace(0., 1., 101)
+    f_grid = np.asarray(f_grid, dtype=float)
+    if n_workers is None:
+        n_workers = worker_budget()
+
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+    if n_workers <= 1 or len(chunks) == 1:
+        results = [classify_points(chunk, f_grid) for chunk in chunks]
+    else:
+        results = list(shared_executor(n_workers).map(classify_points, chunks,
+                                                      itertools.repeat(f_grid)))
+
+    if not results:
+        return np.empty(0, dtype=SWEEP_DTYPE)
+    return np.concatenate(results)
@@ -0,0 +1,159 @@
+"""
+Precomputed lookup tables of the long-time state of the two-type contagion dynamics.
+
+An EquilibriumTable holds $\hat{I}_m^g, \hat{I}_r^g, \hat{I}_m^b, \hat{I}_r^b$ on a
+rectilinear (Rm, Rr, f) grid for a fixed relative infectiousness c, computed once with
+sociality.equilibrium. Queries are answered by vectorized trilinear interpolation,
+together with an estimate of the interpolation error for each query.
+"""
+
+import numpy as np
+
+from sociality.equilibrium import R_net, equilibrium_sweep
+
+
+FIELDS = ('Img', 'Irg', 'Imb', 'Irb')
+
+"""
+Second differences at the nodes underestimate the largest second derivative inside a
+cell, so the smooth part of the error estimate is inflated by this factor.
+"""
+ERROR_SAFETY = 3.
+
+
+def _cell_index(grid, x):
+    """
+    Index of the grid cell containing each x (clipped to the grid) and the fractional
+    position of x within that cell.
+    """
+    index = np.clip(np.searchsorted(grid, x, side='right') - 1, 0, grid.size - 2)
+    weight = (x - grid[index]) / (grid[index + 1] - grid[index])
+    return index, np.clip(weight, 0., 1.)
+
+
+def _cell_error(values, grid, axis):
+    """
+    Bound h^2/8 max|u''| on the error of linear interpolation along one axis, for every
+    cell of the table. Second derivatives are estimated by second differences at the
+    interior nodes, and the largest value on the cell's corners is used.
+    """
+    values = np.moveaxis(values, axis, -1)
+    h = np.diff(grid)
+    slopes = np.diff(values, axis=-1) / h
+    second = np.abs(np.diff(slopes, axis=-1)) / (0.5 * (h[1:] + h[:-1]))
+    second = np.concatenate([second[..., :1], second, second[..., -1:]], axis=-1)
+    cell = np.maximum(second[..., 1:], second[..., :-1]) * h ** 2 / 8.
+    return np.moveaxis(cell, -1, axis)
+
+
+def _over_corners(values, reduce, axes=(1, 2, 3)):
+    """
+    Combine neighbouring nodes along each of the given axes with the binary ufunc
+    reduce, turning node values into values for every cell.
+    """
+    for axis in axes:
+        n = values.shape[axis]
+        values = reduce(np.take(values, range(n - 1), axis=axis),
+                        np.take(values, range(1, n), axis=axis))
+    return values
+
+
+class EquilibriumTable(object):
+    """
+    Long-time states tabulated on the grid Rm_grid x Rr_grid x f_grid for relative
+    infectiousness c. values has shape (4, n_Rm, n_Rr, n_f), in the order of FIELDS.
+    """
+
+    def __init__(self, Rm_grid, Rr_grid, f_grid, c, values, cell_error=None):
+        self.grids = [np.asarray(g, dtype=float) for g in (Rm_grid, Rr_grid, f_grid)]
+        self.c = float(c)
+        self.values = np.asarray(values, dtype=float)
+
+        if cell_error is None:
+            cell_error = self._cell_error()
+        self.cell_error = np.asarray(cell_error, dtype=float)
+
+    @classmethod
+    def build(cls, Rm_grid, Rr_grid, f_grid, c, **kwargs):
+        """
+        Solve for the long-time state at every grid point.
+        """
+        Rm_grid, Rr_grid, f_grid = [np.asarray(g, dtype=float)
+                                    for g in (Rm_grid, Rr_grid, f_grid)]
+        values = equilibrium_sweep(Rm_grid[:, None, None],
+                                   Rr_grid[None, :, None],
+                                   c,
+                                   f_grid[None, None, :],
+                                   **kwargs)
+        return cls(Rm_grid, Rr_grid, f_grid, c, np.stack(values))
+
+    def _cell_error(self):
+        """
+        Interpolation error estimate for every field and cell, with shape
+        (4, n_Rm - 1, n_Rr - 1, n_f - 1). Away from the threshold R_net = 1 this is the
+        sum over the three axes of the second-difference bound, times ERROR_SAFETY.
+        The long-time state is not smooth at the threshold, so in cells that straddle
+        it the estimate is at least the spread of the values over the cell's corners.
+        """
+        Rm, Rr, f = np.meshgrid(*self.grids, indexing='ij')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            R = R_net(Rm, Rr, f)
+        endemic = np.stack([R > 1, R > 1, self.c * R > 1, self.c * R > 1])
+        straddles = (_over_corners(endemic, np.logical_or) &
+                     ~_over_corners(endemic, np.logical_and))
+        spread = (_over_corners(self.values, np.maximum) -
+                  _over_corners(self.values, np.minimum))
+
+        error = 0.
+        for axis, grid in enumerate(self.grids):
+            along = _cell_error(self.values, grid, axis + 1)
+            for other in range(1, 4):
+                if other != axis + 1:
+                    along = _over_corners(along, np.maximum, axes=(other,))
+            error = error + along
+        error = ERROR_SAFETY * error
+        return np.where(straddles, np.maximum(error, spread), error)
+
+    def save(self, filename):
+        np.savez(filename,
+                 Rm_grid=self.grids[0],
+                 Rr_grid=self.grids[1],
+                 f_grid=self.grids[2],
+                 c=self.c,
+                 values=self.values,
+                 cell_error=self.cell_error)
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            return cls(data['Rm_grid'], data['Rr_grid'], data['f_grid'],
+                       data['c'], data['values'], data['cell_error'])
+
+    def _locate(self, Rm, Rr, f):
+        Rm, Rr, f = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                          for x in (Rm, Rr, f)])
+        return [_cell_index(grid, x) for grid, x in zip(self.grids, (Rm, Rr, f))]
+
+    def __call__(self, Rm, Rr, f):
+        """
+        Interpolated (Img, Irg, Imb, Irb) at broadcast query points. Queries outside the
+        grid are clipped to its boundary.
+        """
+        (i, wi), (j, wj), (k, wk) = self._locate(Rm, Rr, f)
+
+        result = 0.
+        for di, ui in ((0, 1 - wi), (1, wi)):
+            for dj, uj in ((0, 1 - wj), (1, wj)):
+                for dk, uk in ((0, 1 - wk), (1, wk)):
+                    result = result + (ui * uj * uk) * \
+                        self.values[:, i + di, j + dj, k + dk]
+
+        return tuple(result)
+
+    def error_bound(self, Rm, Rr, f):
+        """
+        Estimated bound on the interpolation error of each field at broadcast query
+        points, with shape (4,) + broadcast shape.
+        """
+        (i, wi), (j, wj), (k, wk) = self._locate(Rm, Rr, f)
+        return self.cell_error[:, i, j, k]
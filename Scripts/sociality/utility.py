@@ -0,0 +1,56 @@
+"""
+CES utility of the good and bad contagion, evaluated in log space.
+
+    U = (alpha Ig^rho + (1 - alpha) Sb^rho)^(1/rho)
+
+with the Cobb-Douglas utility Ig^alpha Sb^(1 - alpha) as the limit rho -> 0 and the
+linear utility at rho = 1. Working with log U keeps products of small powers away from
+underflow, and a zero weight cancels its term even where the term is infinite, so that
+0^0 = 1 as in the figures.
+"""
+
+import numpy as np
+
+
+"""
+|rho| below which the CES utility is evaluated in its Cobb-Douglas limit.
+"""
+CD_LIMIT = 1e-7
+
+
+def _weighted(weight, term):
+    """
+    weight * term, taken to be zero where the weight is zero even if term is infinite.
+    """
+    return np.where(weight == 0, 0., weight * term)
+
+
+def log_utility(Ig, Sb, alpha, rho=0.):
+    """
+    Logarithm of the CES utility, vectorized over broadcast arguments. Zero utility
+    gives -inf.
+    """
+    Ig, Sb, alpha, rho = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                               for x in (Ig, Sb, alpha, rho)])
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        cd = _weighted(alpha, np.log(Ig)) + _weighted(1 - alpha, np.log(Sb))
+        ces = np.log(_weighted(alpha, np.power(Ig, rho)) +
+                     _weighted(1 - alpha, np.power(Sb, rho))) / rho
+        result = np.where(np.abs(rho) < CD_LIMIT, cd, ces)
+    return np.where(np.isnan(result), -np.inf, result)
+
+
+def log_utility_tensor(alpha, Sb, Ig, rho=0.):
+    """
+    Log utility on the grid alpha x Sb x Ig of 1-D arrays, as an array of shape
+    (n_alpha, n_Sb, n_Ig) computed in one broadcast evaluation.
+    """
+    alpha, Sb, Ig = [np.asarray(x, dtype=float).ravel() for x in (alpha, Sb, Ig)]
+    return log_utility(Ig[None, None, :], Sb[None, :, None], alpha[:, None, None], rho)
+
+
+def utility_tensor(alpha, Sb, Ig, rho=0.):
+    """
+    Utility on the grid alpha x Sb x Ig, as an array of shape (n_alpha, n_Sb, n_Ig).
+    """
+    return np.exp(log_utility_tensor(alpha, Sb, Ig, rho))
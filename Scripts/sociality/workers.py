@@ -0,0 +1,81 @@
+"""
+A process pool shared by everything that runs in one process.
+
+Starting worker processes and importing numpy and this package in them takes about as
+long as some of the computations handed to them. shared_executor creates one pool per
+process on first use and hands the same pool to every later caller, so that a batch of
+figures rendered in one process (see render_figures.py) starts its workers once, and
+later figures find the workers' imports and in-memory caches warm.
+
+The workers of a shared pool have a worker budget of one, so that code run in them
+computes serially instead of starting pools or threads of its own: nested pools would
+start up to the square of the number of cores. Functions that take n_workers default
+to worker_budget().
+"""
+
+import atexit
+import concurrent.futures
+import os
+
+
+_executor = None
+_n_workers = None
+_pid = None
+_budget = None
+
+
+def worker_budget():
+    """
+    The number of processes or threads that work started in this process may use:
+    one in the workers of a shared pool, and otherwise all cores unless set with
+    set_worker_budget.
+    """
+    return _budget or os.cpu_count() or 1
+
+
+def set_worker_budget(n_workers):
+    """
+    Set the worker budget of this process (all cores if n_workers is None), and return
+    the previous one.
+    """
+    global _budget
+    previous = _budget
+    _budget = n_workers
+    return previous
+
+
+def shared_executor(n_workers=None):
+    """
+    The process pool of this process, with n_workers workers (by default the worker
+    budget), each of which has a worker budget of one.
+    It is created on first use, and replaced when a different number of workers is
+    asked for or when this process was forked from the one that created it.
+    """
+    global _executor, _n_workers, _pid
+    if n_workers is None:
+        n_workers = worker_budget()
+
+    if _executor is not None and _pid != os.getpid():
+        _executor = None
+    if _executor is not None and _n_workers != n_workers:
+        _executor.shutdown()
+        _executor = None
+    if _executor is None:
+        _executor = concurrent.futures.ProcessPoolExecutor(
+            n_workers, initializer=set_worker_budget, initargs=(1,))
+        _n_workers = n_workers
+        _pid = os.getpid()
+    return _executor
+
+
+def shutdown():
+    """
+    Shut down the pool of this process, if there is one.
+    """
+    global _executor
+    if _executor is not None and _pid == os.getpid():
+        _executor.shutdown()
+    _executor = None
+
+
+atexit.register(shutdown)
@@ -9,16 +9,23 @@ import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.font_manager
 
+from sociality.utility import log_utility, utility_tensor
+from sociality.output import render_rc, save_figure
+
 #from matplotlib import rc
 #rc('font',**{'family':'sans-serif','sans-serif':['Helvetica']})
 ## for Palatino and other serif fonts use:
 #rc('font',**{'family':'serif','serif':['Palatino']})
 #rc('text', usetex=True)
 
-plt.rcParams['text.usetex'] = True 
-plt.rcParams['text.latex.preamble'] = [r'\usepackage[cm]{sfmath}']
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'cm'
+"""
+Text is typeset with LaTeX in sans-serif Computer Modern for the 'publication' render
+profile, and with mathtext for the 'preview' profile (see sociality.output).
+"""
+plt.rcParams.update(render_rc({'text.usetex': True,
+							   'text.latex.preamble': r'\usepackage[cm]{sfmath}',
+							   'font.family': 'sans-serif',
+							   'font.sans-serif': 'cm'}))
 
 alpha1 = 0.25 
 alpha2 = 0.5 
@@ -34,42 +41,33 @@ of individuals infected by the good contagion and susceptible to the bad contagi
 """
 
 def Utility(Ig,Sb,alpha):
-	return (Ig ** alpha) * (Sb ** (1.0 - alpha))
+	return np.exp(log_utility(Ig,Sb,alpha))
 	
 def Equilibrium_Ig(Rr):
 	return 1. - (1. / Rr)
 	
 def Equilibrium_Sb(Rr,c):
-	return min(1.,1. / (c * Rr))
+	return np.minimum(1.,1. / (c * Rr))
 	
 def Utility_eq(Rr,c,alpha):
 	return Utility(Equilibrium_Ig(Rr),Equilibrium_Sb(Rr,c),alpha)
 	
-Equilibrium_Sb_vec = np.vectorize(Equilibrium_Sb)
-Utility_eq_vec = np.vectorize(Utility_eq)
 
 value_step  = 0.01
 value_array = np.arange(0.0,1.0 + value_step,value_step)
-value_list = [value for value in value_array]
-value_length = len(value_list)
+value_length = len(value_array)
 
 
 R_range = np.arange(1.,5.,value_step)
 
 
 """
-Calculating Cobb-Douglas utility for range of levels of the good and bad contagion.
+Calculating Cobb-Douglas utility for range of levels of the good and bad contagion, as
+a tensor indexed by (alpha, Sb, Ig) evaluated in one broadcast.
 """
 
-utility_matrix1 = np.zeros([value_length,value_length])
-utility_matrix2 = np.zeros([value_length,value_length])
-utility_matrix3 = np.zeros([value_length,value_length])
-
-for Sb in value_list:
-	for Ig in value_list:
-		utility_matrix1[value_list.index(Sb),value_list.index(Ig)] = Utility(Ig,Sb,alpha1)
-		utility_matrix2[value_list.index(Sb),value_list.index(Ig)] = Utility(Ig,Sb,alpha2)
-		utility_matrix3[value_list.index(Sb),value_list.index(Ig)] = Utility(Ig,Sb,alpha3)
+utility_matrix1, utility_matrix2, utility_matrix3 = utility_tensor(
+	[alpha1,alpha2,alpha3],value_array,value_array)
 
 
 """
@@ -78,9 +76,7 @@ Generating heatmap of Cobb-Douglas utility as a function of Ig and Sb.
 
 d = np.linspace(0.,1.,200)
 Ig,Sb = np.meshgrid(d,d)
-z1 = Utility(Ig,Sb,alpha1)
-z2 = Utility(Ig,Sb,alpha2)
-z3 = Utility(Ig,Sb,alpha3)
+z1,z2,z3 = utility_tensor([alpha1,alpha2,alpha3],d,d)
 
 cmap2 = matplotlib.colors.ListedColormap(["k","k"])
 
@@ -137,13 +133,13 @@ $c$).
 axs[0,2].set_xlabel(r"Probability Informed $\overline{I}^g$", fontsize = 16.)#
 
 axs[1,0].plot(R_range,Equilibrium_Ig(R_range), lw = 3., color = 'b', label = r"$\overline{I}^g$")
-axs[1,0].plot(R_range,Equilibrium_Sb_vec(R_range,c1), lw = 3., color = 'g', label = r"$\overline{S}^b$")
+axs[1,0].plot(R_range,Equilibrium_Sb(R_range,c1), lw = 3., color = 'g', label = r"$\overline{S}^b$")
 
 axs[1,1].plot(R_range,Equilibrium_Ig(R_range), lw = 3., color = 'b')
-axs[1,1].plot(R_range,Equilibrium_Sb_vec(R_range,c2), lw = 3., color = 'g')
+axs[1,1].plot(R_range,Equilibrium_Sb(R_range,c2), lw = 3., color = 'g')
 
 axs[1,2].plot(R_range,Equilibrium_Ig(R_range), lw = 3., color = 'b')
-axs[1,2].plot(R_range,Equilibrium_Sb_vec(R_range,c3), lw = 3., color = 'g')
+axs[1,2].plot(R_range,Equilibrium_Sb(R_range,c3), lw = 3., color = 'g')
 
 axs[1,0].legend(loc = "lower center")
 
@@ -156,9 +152,9 @@ cases of the relative infectiousness parameter $c$ and relative weight $\alpha$
 on the good and bad contagion in the Cobb-Douglas formula. 
 """
 
-axs[2,0].plot(R_range,Utility_eq_vec(R_range,c1,alpha1), lw = 3., color = 'b')
-axs[2,1].plot(R_range,Utility_eq_vec(R_range,c2,alpha2), lw = 3., color = 'b')
-axs[2,2].plot(R_range,Utility_eq_vec(R_range,c3,alpha3), lw = 3., color = 'b')
+axs[2,0].plot(R_range,Utility_eq(R_range,c1,alpha1), lw = 3., color = 'b')
+axs[2,1].plot(R_range,Utility_eq(R_range,c2,alpha2), lw = 3., color = 'b')
+axs[2,2].plot(R_range,Utility_eq(R_range,c3,alpha3), lw = 3., color = 'b')
 
 axs[2,0].set_ylabel(r"Utility $U(\overline{I}^g,\overline{S}^b)$", fontsize = 16.)
 axs[2,1].set_xlabel(r"Good Contagion Reproduction Number $\mathcal{R}^g$", fontsize = 16.)
@@ -194,7 +190,7 @@ axs[2,2].text(panel_label_x,  panel_label_y, 'i', transform=axs[2,2].transAxes,
       fontsize=16, fontweight='bold', va='top', ha='right')
 
 plt.tight_layout()
-plt.savefig("socialoptimumfigure.png")
+save_figure(plt.gcf(), "socialoptimumfigure.png")
 
 plt.figure(2)
 
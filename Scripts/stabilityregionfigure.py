@@ -9,84 +9,57 @@ import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.font_manager
 
+from sociality.stability import stability_masks, stability_boundary
+from sociality.output import render_rc, save_figure
 
 
-plt.rcParams['text.usetex'] = True 
-plt.rcParams['text.latex.preamble'] = [r'\usepackage[cm]{sfmath}']
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'cm'
+
+"""
+Text is typeset with LaTeX in sans-serif Computer Modern for the 'publication' render
+profile, and with mathtext for the 'preview' profile (see sociality.output).
+"""
+plt.rcParams.update(render_rc({'text.usetex': True,
+							   'text.latex.preamble': r'\usepackage[cm]{sfmath}',
+							   'font.family': 'sans-serif',
+							   'font.sans-serif': 'cm'}))
 
 
 
 """
 Using our formula for the basic reproduction number of the two-type contagion dynamics
 to determine the stability boundary for the disease-free and endemic equilibria (where
-$R_{net} = 1$).
+$R_{net} = 1$), for all five fractions $f$ in one evaluation.
 """
 
-def Locus(Rm,Rr,f):
-	first_term = 4. * f * ((Rm - 0.5) ** 2)
-	second_term = 4. * (1. - f) * (((Rr - 0.5) ** 2))
-	return first_term + second_term
-	
-
-
 d = np.linspace(0,2,2000)
-Rm,Rr = np.meshgrid(d,d)
-z = (Locus(Rm,Rr,0.4) >= 1).astype(int)
+f_values = [0.0,0.25,0.5,0.75,1.]
+masks = stability_masks(d,d,f_values)
 
 
 cmap = matplotlib.colors.ListedColormap(["b","b"])
-cmap2 = matplotlib.colors.ListedColormap(["k","k"])
 
 
 """
-Illustrating the stability regions for five sample fractions $f$ of the mutant strategy.
+Illustrating the stability regions for five sample fractions $f$ of the mutant strategy,
+with the exact stability boundary (the lines $\mathcal{R}_r = 1$ and $\mathcal{R}_m = 1$
+for $f = 0$ and $f = 1$) dashed.
 """
 
 fig, ax = plt.subplots(1,5, figsize = (10,3), sharey = True)
 
-z = (Locus(Rm,Rr,0.0) >= 1).astype(int)
-ax[0].contourf(Rr,Rm,z, [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
-#ax[0].contour(Rr,Rm,z, [0.99999,1.00001], cmap = cmap2, linewidths = 3., linestyles = 'dashed')
-ax[0].axvline(x = 1., lw = 3., ls = '--', color = 'k')
+for panel, (f, z) in enumerate(zip(f_values,masks)):
+	ax[panel].contourf(d,d,z.astype(int), [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
+	for Rm_boundary, Rr_boundary in stability_boundary(f):
+		ax[panel].plot(Rr_boundary,Rm_boundary, lw = 3., ls = '--', color = 'k')
+	ax[panel].set_xticks([0.0,0.5,1.0,1.5,2.0])
+	ax[panel].grid(alpha = 0.6, ls = '-', lw = 1.)
+	ax[panel].set_title(r"$f = {:g}$".format(f))
+	ax[panel].set_xlim(0.,2.)
+	ax[panel].set_ylim(0.,2.)
 
 ax[0].set_ylabel(r"$\mathcal{R}_m$", fontsize = 16.)
-ax[0].set_xticks([0.0,0.5,1.0,1.5,2.0])
-ax[0].grid(alpha = 0.6, ls = '-', lw = 1.)
-ax[0].set_title(r"$f = 0$")
-
-
-z = (Locus(Rm,Rr,0.25) >= 1).astype(int)
-ax[1].contourf(Rr,Rm,z, [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
-ax[1].contour(Rr,Rm,z, [0.99999,1.00001], cmap = cmap2, linewidths = 3., linestyles = 'dashed')
-ax[1].set_xticks([0.0,0.5,1.0,1.5,2.0])
-ax[1].grid(alpha = 0.6, ls = '-', lw = 1.)
-ax[1].set_title(r"$f = 0.25$")
-
-z = (Locus(Rm,Rr,0.5) >= 1).astype(int)
-ax[2].contourf(Rr,Rm,z, [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
-ax[2].contour(Rr,Rm,z, [0.99999,1.00001], cmap = cmap2, linewidths = 3., linestyles = 'dashed')
 ax[2].set_xlabel(r"$\mathcal{R}_r$", fontsize = 16.)
-ax[2].set_xticks([0.0,0.5,1.0,1.5,2.0])
-ax[2].grid(alpha = 0.6, ls = '-', lw = 1.)
-ax[2].set_title(r"$f = 0.5$")
-
-z = (Locus(Rm,Rr,0.75) >= 1).astype(int)
-ax[3].contourf(Rr,Rm,z, [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
-ax[3].contour(Rr,Rm,z, [0.99999,1.00001], cmap = cmap2, linewidths = 3., linestyles = 'dashed')
-ax[3].set_xticks([0.0,0.5,1.0,1.5,2.0])
-ax[3].grid(alpha = 0.6, ls = '-', lw = 1.)
-ax[3].set_title(r"$f = 0.75$")
-
-z = (Locus(Rm,Rr,1.) >= 1).astype(int)
-ax[4].contourf(Rr,Rm,z, [0.99999, 1.00001], cmap=cmap, alpha = 0.6)
-#ax[4].contour(Rr,Rm,z, [0.99999,1.00001], cmap = cmap2, linewidths = 3., linestyles = 'dashed')
-ax[4].axhline(y = 1., lw = 3., ls = '--', color = 'k')
-ax[4].grid(alpha = 0.6, ls = '-', lw = 1.)
-ax[4].set_xticks([0.0,0.5,1.0,1.5,2.0])
-ax[4].set_title(r"$f = 1$")
 plt.tight_layout()
 
-plt.savefig("stabilityregionfigure.png")
+save_figure(plt.gcf(), "stabilityregionfigure.png")
 plt.show()
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from sociality import cache
+from sociality.cache import ArrayCache
+
+
+def _fill(store, n_entries):
+    for i in range(n_entries):
+        store.put('key{}'.format(i), np.full(1000, float(i)))
+        os.utime(store._path('key{}'.format(i)), (i, i))
+
+
+def test_evict_ignores_files_deleted_by_another_process(tmp_path, monkeypatch):
+    store = ArrayCache(str(tmp_path), max_disk_bytes=2 ** 30)
+    _fill(store, 4)
+    store.max_disk_bytes = 1
+
+    real_stat, real_remove = os.stat, os.remove
+
+    def delete(path):
+        try:
+            real_remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stat_after_deletion(path, *args, **kwargs):
+        if str(path).endswith('key0.npz'):
+            delete(path)
+        return real_stat(path, *args, **kwargs)
+
+    def remove_after_deletion(path, *args, **kwargs):
+        if str(path).endswith('key1.npz'):
+            delete(path)
+        return real_remove(path, *args, **kwargs)
+
+    monkeypatch.setattr(cache.os, 'stat', stat_after_deletion)
+    monkeypatch.setattr(cache.os, 'remove', remove_after_deletion)
+    store._evict()
+
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith('.npz')]
+
+
+def test_evict_keeps_most_recently_used(tmp_path):
+    store = ArrayCache(str(tmp_path), max_disk_bytes=2 ** 30)
+    _fill(store, 4)
+    sizes = [os.path.getsize(store._path('key{}'.format(i))) for i in range(4)]
+    store.max_disk_bytes = sizes[2] + sizes[3]
+    store._evict()
+
+    remaining = sorted(name for name in os.listdir(str(tmp_path)) if name.endswith('.npz'))
+    assert remaining == ['key2.npz', 'key3.npz']
+
+
+def test_get_ignores_file_deleted_after_loading(tmp_path, monkeypatch):
+    store = ArrayCache(str(tmp_path))
+    _fill(store, 1)
+    store.memory.clear()
+
+    def utime_after_deletion(path, *args, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(cache.os, 'utime', utime_after_deletion)
+    assert np.array_equal(store.get('key0'), np.zeros(1000))
+
+
+def test_put_removes_temporary_file_on_failure(tmp_path, monkeypatch):
+    store = ArrayCache(str(tmp_path), compress=False)
+
+    def failing_save(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(cache.np, 'savez', failing_save)
+    with pytest.raises(OSError):
+        store.put('key0', np.zeros(1000))
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,26 @@
+import numpy as np
+
+from sociality.dilemma import ces_gradient_sign, ess_cd, ess_ces
+
+
+def test_ess_ces_stops_at_first_stable_zero():
+    # For rho > 1 and c < 1 the gradient is negative on about (2.27, 5.73) and
+    # positive again beyond, so the far end alone suggests an unbounded ESS.
+    R_ESS = ess_ces(0.4, 0.5, 2.)
+    assert np.isclose(R_ESS, 2.2679, atol=1e-4)
+    assert ces_gradient_sign(R_ESS - 1e-6, 0.4, 0.5, 2.) > 0
+    assert ces_gradient_sign(R_ESS + 1e-6, 0.4, 0.5, 2.) < 0
+
+
+def test_ess_ces_matches_cobb_douglas():
+    alpha, c = np.meshgrid([0.25, 0.5, 0.75], [0.25, 1., 4.])
+    assert np.allclose(ess_ces(alpha, c, 0.), ess_cd(alpha, c))
+
+
+def test_ess_ces_stays_at_lower_bound_when_gradient_starts_negative():
+    # For 0 < rho < 1 and c > 1 the gradient is negative just above R = 1 although it
+    # is positive further in, up to a second zero near R = 17.99.
+    R = np.linspace(1.01, 10., 100)
+    assert (ces_gradient_sign(R, 0.75, 2., 0.5) > 0).any()
+    assert ces_gradient_sign(1. + 1e-6, 0.75, 2., 0.5) < 0
+    assert ess_ces(0.75, 2., 0.5) == 1.
@@ -0,0 +1,20 @@
+import numpy as np
+
+from sociality.contagion import integrate
+from sociality.equilibrium import endemic_weight
+
+
+def test_endemic_weight_matches_long_euler_integration():
+    Rm, Rr, f = np.meshgrid([0.5, 1.5, 3., 12.], [0.8, 4., 16.], [0., 0.3, 1.],
+                            indexing='ij')
+    W, converged = endemic_weight(Rm, Rr, f)
+    assert converged.all()
+
+    solution = integrate(Rm, Rr, f, 0.5, 0.5, method='euler', time_step=0.05,
+                         t_max=20000., residual_tol=1e-12)
+    assert solution.converged.all()
+    # A type that is absent (f = 0 or 1) does not affect the weight, but is still
+    # driven to its own state under it.
+    assert np.allclose(solution.Im, Rm * W / (1 + Rm * W), atol=1e-8)
+    assert np.allclose(solution.Ir, Rr * W / (1 + Rr * W), atol=1e-8)
+    assert (W[(f == 1) & (Rm < 1)] == 0).all()
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from sociality.invasion import InvasionMapper, tiled_invasion_map
+
+
+@pytest.mark.parametrize('fitness_func, kwargs', [('cd', {}), ('linear', {}),
+                                                  ('ces', {'rho': 0.5})])
+@pytest.mark.parametrize('mutual', [True, False])
+def test_invasion_mapper_matches_tiled_invasion_map(fitness_func, kwargs, mutual):
+    symmetric = np.linspace(1.01, 8., 61)
+    grids = [(symmetric, symmetric), (symmetric, np.linspace(1.2, 6., 37))]
+    for res_points, mut_points in grids:
+        mapper = InvasionMapper(res_points, mut_points, fitness_func=fitness_func,
+                                mutual=mutual, **kwargs)
+        # The same mapper for changing c and alpha, as in adjustable_pip.
+        for alpha, c in [(0.5, 0.5), (0.25, 0.5), (0.25, 2.), (0.75, 1.)]:
+            expected = tiled_invasion_map(res_points, mut_points, alpha, c,
+                                          fitness_func=fitness_func, mutual=mutual,
+                                          tile_size=16, n_workers=1, **kwargs)
+            assert np.array_equal(mapper(alpha, c), expected)
@@ -0,0 +1,22 @@
+import itertools
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+
+from sociality.optimum import monomorphic_log_utility, social_optimum_ces
+
+
+def test_social_optimum_ces_matches_numerical_optimiser():
+    for alpha, c, rho in itertools.product([0.2, 0.5, 0.8], [0.3, 1., 3.],
+                                           [-2., -0.5, 0., 0.5, 0.9, 1.5]):
+        R_opt = social_optimum_ces(alpha, c, rho)
+        corner = max(1., 1. / c)
+        # Search log(R) up to R = 1e8, a stand-in for R -> infinity.
+        numerical = minimize_scalar(
+            lambda log_R: -monomorphic_log_utility(np.exp(log_R), alpha, c, rho),
+            bounds=(np.log(corner), np.log(1e8)), method='bounded',
+            options={'xatol': 1e-10})
+        best = -numerical.fun
+        assert monomorphic_log_utility(R_opt, alpha, c, rho) >= best - 1e-9
+        if corner < R_opt < 1e6:
+            assert np.isclose(R_opt, np.exp(numerical.x), rtol=1e-4)
@@ -0,0 +1,34 @@
+import itertools
+
+import numpy as np
+
+from sociality.regimes import (ABOVE, BELOW, CORNER, EQUAL, INFINITE, INTERIOR,
+                               classify, regime_code, regime_features, regime_map)
+
+
+def test_regime_codes_are_distinct_and_invertible():
+    features = list(itertools.product([CORNER, INTERIOR, INFINITE], repeat=2))
+    features = [(ess, optimum, order) for ess, optimum in features
+                for order in (BELOW, EQUAL, ABOVE)]
+    codes = [regime_code(*feature) for feature in features]
+    assert sorted(codes) == list(range(27))
+    assert [regime_features(code) for code in codes] == features
+
+
+def test_classify_cobb_douglas_regimes():
+    # alpha = 0.5, c = 0.5: R_ESS = 1/c + alpha/(1 - alpha) = 3 is interior, above the
+    # corner optimum R_opt = 1/c = 2. alpha = 0.75, c = 2: R_ESS = 3.5 is interior,
+    # below the interior optimum R_opt = 1/(1 - alpha) = 4.
+    result = regime_map(np.array([0.5, 0.75]), np.array([0.5, 2.]))
+    assert np.allclose(result.R_ESS, [3., 3.5])
+    assert np.allclose(result.R_opt, [2., 4.])
+    assert list(result.regime) == [regime_code(INTERIOR, CORNER, ABOVE),
+                                   regime_code(INTERIOR, INTERIOR, BELOW)]
+
+
+def test_classify_equal_and_infinite():
+    codes = classify(np.array([2., np.inf, 1.]), np.array([2. * (1 + 1e-12), np.inf, 5.]),
+                     np.array([0.5, 1., 2.]))
+    assert list(codes) == [regime_code(CORNER, CORNER, EQUAL),
+                           regime_code(INFINITE, INFINITE, EQUAL),
+                           regime_code(CORNER, INTERIOR, BELOW)]
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from sociality.stability import stability_boundary, stability_masks, unpack_masks
+
+
+@pytest.mark.parametrize('f', [0., 0.2, 0.5, 0.9, 1.])
+def test_stability_boundary_separates_the_masks(f):
+    (Rm, Rr), = stability_boundary(f, n_points=73)
+    if 0. < f < 1.:
+        # Move every point of the ellipse a little outwards or inwards from its centre.
+        outward = (0.5 + 1.01 * (Rm - 0.5), 0.5 + 1.01 * (Rr - 0.5))
+        inward = (0.5 + 0.99 * (Rm - 0.5), 0.5 + 0.99 * (Rr - 0.5))
+    elif f == 0.:
+        outward, inward = (Rm, Rr + 0.01), (Rm, Rr - 0.01)
+    else:
+        outward, inward = (Rm + 0.01, Rr), (Rm - 0.01, Rr)
+
+    for (Rm_points, Rr_points), expected in [(outward, True), (inward, False)]:
+        for Rm_point, Rr_point in zip(Rm_points, Rr_points):
+            mask = stability_masks([Rm_point], [Rr_point], [f])
+            assert mask[0, 0, 0] == expected
+
+
+def test_packed_stability_masks_unpack_to_the_masks():
+    Rm_points, Rr_points = np.linspace(0., 2., 41), np.linspace(0., 2., 37)
+    f_values = np.linspace(0., 1., 11)
+    masks = stability_masks(Rm_points, Rr_points, f_values, chunk_size=3)
+    packed = stability_masks(Rm_points, Rr_points, f_values, packed=True)
+    assert np.array_equal(unpack_masks(packed, Rr_points.size), masks)
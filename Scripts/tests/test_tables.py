@@ -0,0 +1,21 @@
+import numpy as np
+
+from sociality.equilibrium import equilibrium_sweep
+from sociality.tables import EquilibriumTable
+
+
+def test_equilibrium_table_error_bound_holds():
+    c = 2.
+    table = EquilibriumTable.build(np.linspace(0.5, 6., 23), np.linspace(0.5, 6., 23),
+                                   np.linspace(0., 1., 21), c)
+    random = np.random.RandomState(0)
+    Rm, Rr = random.uniform(0.5, 6., (2, 4000))
+    f = random.uniform(0., 1., 4000)
+
+    exact = np.stack(equilibrium_sweep(Rm, Rr, c, f))
+    error = np.abs(np.stack(table(Rm, Rr, f)) - exact)
+    bound = table.error_bound(Rm, Rr, f)
+    assert (error <= bound + 1e-12).all()
+    # Cells across the thresholds R_net = 1 and c R_net = 1 get the spread of their
+    # values as the bound, but the typical bound stays small.
+    assert np.median(bound) < 5e-3
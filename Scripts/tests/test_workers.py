@@ -0,0 +1,18 @@
+from sociality import workers
+
+
+def test_pool_workers_compute_serially():
+    executor = workers.shared_executor(2)
+    try:
+        assert executor.submit(workers.worker_budget).result() == 1
+    finally:
+        workers.shutdown()
+
+
+def test_set_worker_budget_returns_previous():
+    previous = workers.set_worker_budget(3)
+    try:
+        assert workers.worker_budget() == 3
+        assert workers.set_worker_budget(2) == 3
+    finally:
+        workers.set_worker_budget(previous)